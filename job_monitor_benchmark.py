@@ -0,0 +1,728 @@
+"""
+JOB MONITOR - BENCHMARKS
+Mide el rendimiento de la capa de datos y de la capa HTTP del monitor
+Todas las pruebas usan BDs temporales: job_monitor.db no se toca
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bs4 import BeautifulSoup
+
+from job_monitor_txt_2 import (
+    DIRECTORIO_FIXTURES, PARSERS, DatabaseManager, JobMonitorConfig, backend_html,
+    crear_sesion_http, huella_oferta
+)
+
+# ============================================================================
+# UTILIDADES
+# ============================================================================
+
+def ofertas_sinteticas(cantidad, prefijo="bench"):
+    """Genera ofertas falsas con la misma forma que las del scraper"""
+    portales = ["indeed", "infojobs", "computrabajo"]
+    ofertas = []
+    
+    for i in range(cantidad):
+        portal = portales[i % len(portales)]
+        titulo = f"Backend Developer Java {prefijo} {i}"
+        empresa = f"Empresa {i % 97}"
+        ofertas.append({
+            "id": f"{portal}_{titulo}_{empresa}".replace(" ", "_"),
+            "titulo": titulo,
+            "empresa": empresa,
+            "url": f"https://example.com/{portal}/{i}",
+            "salario": "No especificado",
+            "portal": portal,
+            "fecha_publicacion": datetime.now()
+        })
+    
+    return ofertas
+
+
+def cronometrar(funcion, *args):
+    """Devuelve los segundos que tarda en ejecutarse la función"""
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def imprimir_resultado(nombre, segundos, operaciones):
+    """Imprime una fila de resultados"""
+    por_operacion = segundos / operaciones * 1000 if operaciones else 0
+    print(f"   • {nombre:38} {segundos:8.3f} s  ({por_operacion:.3f} ms/op)")
+
+
+# ============================================================================
+# BENCHMARK 1: CONEXIÓN POR LLAMADA VS CONEXIÓN PERSISTENTE
+# ============================================================================
+
+class ConexionPorLlamada:
+    """Reproduce el comportamiento anterior: connect/commit/close por método"""
+    
+    def __init__(self, db_name):
+        self.db_name = db_name
+        DatabaseManager(db_name).cerrar()  # Mismo esquema que el monitor
+    
+    def oferta_existe(self, oferta_id):
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM ofertas WHERE id = ?", (oferta_id,))
+        resultado = cursor.fetchone()
+        conn.close()
+        return resultado is not None
+    
+    def guardar_oferta(self, oferta):
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO ofertas (id, titulo, empresa, url, salario, portal,
+                                fecha_publicacion, fecha_encontrada)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            oferta["id"], oferta["titulo"], oferta["empresa"], oferta["url"],
+            oferta["salario"], oferta["portal"], oferta["fecha_publicacion"],
+            datetime.now()
+        ))
+        conn.commit()
+        conn.close()
+
+
+def _ronda_por_llamada(db, ofertas):
+    """Una ronda de ejecutar_monitoreo con conexión por llamada"""
+    for oferta in ofertas:
+        if not db.oferta_existe(oferta["id"]):
+            db.guardar_oferta(oferta)
+
+
+def _ronda_persistente(db, ofertas):
+    """Una ronda de ejecutar_monitoreo con la conexión persistente"""
+    with db.transaccion():
+        for oferta in ofertas:
+            if not db.oferta_existe(oferta["id"]):
+                db.guardar_oferta(oferta)
+
+
+def benchmark_conexiones(cantidad=500):
+    """Compara connect-por-llamada con la conexión persistente + WAL"""
+    print("\n" + "="*70)
+    print(f"🧪 CONEXIÓN POR LLAMADA VS PERSISTENTE ({cantidad} ofertas)")
+    print("="*70 + "\n")
+    
+    directorio = tempfile.mkdtemp(prefix="job_monitor_bench_")
+    try:
+        ofertas = ofertas_sinteticas(cantidad)
+        
+        antigua = ConexionPorLlamada(os.path.join(directorio, "por_llamada.db"))
+        nueva = DatabaseManager(os.path.join(directorio, "persistente.db"))
+        
+        # Primera ronda: todas nuevas; segunda ronda: todas duplicadas
+        t_antigua = cronometrar(_ronda_por_llamada, antigua, ofertas)
+        t_antigua_dup = cronometrar(_ronda_por_llamada, antigua, ofertas)
+        t_nueva = cronometrar(_ronda_persistente, nueva, ofertas)
+        t_nueva_dup = cronometrar(_ronda_persistente, nueva, ofertas)
+        nueva.cerrar()
+        
+        imprimir_resultado("Por llamada (ofertas nuevas)", t_antigua, cantidad)
+        imprimir_resultado("Por llamada (duplicadas)", t_antigua_dup, cantidad)
+        imprimir_resultado("Persistente (ofertas nuevas)", t_nueva, cantidad)
+        imprimir_resultado("Persistente (duplicadas)", t_nueva_dup, cantidad)
+        
+        print(f"\n📊 Aceleración: x{t_antigua / t_nueva:.1f} nuevas, "
+              f"x{t_antigua_dup / t_nueva_dup:.1f} duplicadas")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+# ============================================================================
+# BENCHMARK 2: OFERTA A OFERTA VS DIFERENCIA POR LOTES
+# ============================================================================
+
+def _ronda_por_lotes(db, ofertas):
+    """Una ronda de ejecutar_monitoreo con registrar_ofertas_nuevas"""
+    db.registrar_ofertas_nuevas(ofertas)
+
+
+def benchmark_lotes(cantidad=2000, historico=20000, repeticiones=5):
+    """Compara oferta_existe + guardar_oferta con la diferencia por lotes
+    
+    Mide por separado la diferencia (qué ids son nuevos) y la ronda completa,
+    mejor tiempo de `repeticiones`, cada ronda sobre una copia de la misma BD.
+    """
+    print("\n" + "="*70)
+    print(f"🧪 OFERTA A OFERTA VS LOTES ({cantidad} ofertas, {historico} en BD)")
+    print("="*70 + "\n")
+    
+    directorio = tempfile.mkdtemp(prefix="job_monitor_bench_")
+    try:
+        previas = ofertas_sinteticas(historico, prefijo="historico")
+        # Mitad ya conocidas, mitad nuevas: lo habitual en una ronda
+        ronda = previas[:cantidad // 2] + ofertas_sinteticas(cantidad // 2)
+        ids = [oferta["id"] for oferta in ronda]
+        
+        base = os.path.join(directorio, "base.db")
+        db = DatabaseManager(base)
+        db.registrar_ofertas_nuevas(previas)
+        
+        # Solo la diferencia: las dos van por la conexión persistente y la PK entera
+        t_existe = min(cronometrar(lambda: [db.oferta_existe(i) for i in ids])
+                       for _ in range(repeticiones))
+        t_in = min(cronometrar(db.ids_existentes, ids) for _ in range(repeticiones))
+        db.cerrar()
+        imprimir_resultado("Diferencia: oferta_existe", t_existe, cantidad)
+        imprimir_resultado("Diferencia: IN por bloques", t_in, cantidad)
+        
+        resultados = {}
+        for nombre, ronda_fn in [("Ronda oferta a oferta", _ronda_persistente),
+                                 ("Ronda por lotes", _ronda_por_lotes)]:
+            tiempos = []
+            for n in range(repeticiones):
+                copia = os.path.join(directorio, f"{ronda_fn.__name__}_{n}.db")
+                shutil.copy(base, copia)
+                db = DatabaseManager(copia)
+                tiempos.append(cronometrar(ronda_fn, db, ronda))
+                db.cerrar()
+            resultados[nombre] = min(tiempos)
+            imprimir_resultado(nombre, resultados[nombre], cantidad)
+        
+        print(f"\n📊 Diferencia: x{t_existe / t_in:.1f}; ronda completa: "
+              f"x{resultados['Ronda oferta a oferta'] / resultados['Ronda por lotes']:.1f}")
+        # Los INSERT (triggers de FTS5, índices, contadores) son iguales en los dos
+        # caminos y pesan más que la diferencia: el lote solo ahorra esa parte
+        print(f"   La diferencia es el {t_in / resultados['Ronda por lotes']:.0%} de la ronda "
+              f"por lotes; el resto son los INSERT de las {cantidad - cantidad // 2} nuevas")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+# ============================================================================
+# BENCHMARK 3: RESUMEN DIARIO CON DATE() VS RANGO INDEXADO
+# ============================================================================
+
+def _poblar_historico(db_name, cantidad, dias=730):
+    """Crea una tabla ofertas sintética repartida en los últimos días"""
+    conn = sqlite3.connect(db_name)
+    conn.execute("""
+        CREATE TABLE ofertas (
+            id TEXT PRIMARY KEY,
+            titulo TEXT,
+            empresa TEXT,
+            url TEXT,
+            salario TEXT,
+            portal TEXT,
+            fecha_publicacion TIMESTAMP,
+            fecha_encontrada TIMESTAMP
+        )
+    """)
+    
+    portales = ["indeed", "infojobs", "computrabajo"]
+    inicio = datetime.now() - timedelta(days=dias)
+    paso = timedelta(days=dias) / cantidad
+    
+    def filas():
+        for i in range(cantidad):
+            fecha = inicio + paso * i
+            yield (f"oferta_{i}", f"Backend {i}", f"Empresa {i % 997}",
+                   f"https://example.com/{i}", "No especificado",
+                   portales[i % 3], fecha, fecha)
+    
+    conn.executemany("INSERT INTO ofertas VALUES (?, ?, ?, ?, ?, ?, ?, ?)", filas())
+    conn.commit()
+    conn.close()
+
+
+def benchmark_resumen_diario(cantidad=1000000, repeticiones=20):
+    """Compara WHERE DATE(fecha_encontrada) = ? con el rango semiabierto"""
+    print("\n" + "="*70)
+    print(f"🧪 RESUMEN DIARIO: DATE() VS RANGO INDEXADO ({cantidad} ofertas)")
+    print("="*70 + "\n")
+    
+    directorio = tempfile.mkdtemp(prefix="job_monitor_bench_")
+    try:
+        db_name = os.path.join(directorio, "historico.db")
+        print("⏳ Generando histórico sintético...")
+        _poblar_historico(db_name, cantidad)
+        
+        ayer = datetime.now().date() - timedelta(days=1)
+        
+        # Consulta anterior: función sobre la columna, sin índice
+        conn = sqlite3.connect(db_name)
+        
+        def consulta_date():
+            for _ in range(repeticiones):
+                conn.execute("""
+                    SELECT titulo, empresa, url, salario, portal
+                    FROM ofertas WHERE DATE(fecha_encontrada) = ?
+                """, (ayer,)).fetchall()
+        
+        t_date = cronometrar(consulta_date)
+        conn.close()
+        
+        # Consulta nueva: DatabaseManager crea los índices y usa el rango
+        db = DatabaseManager(db_name)
+        
+        def consulta_rango():
+            for _ in range(repeticiones):
+                db.obtener_ofertas_del_dia(ayer)
+        
+        t_rango = cronometrar(consulta_rango)
+        filas = len(db.obtener_ofertas_del_dia(ayer))
+        db.cerrar()
+        
+        print(f"   • Ofertas en el día consultado: {filas}\n")
+        imprimir_resultado("DATE(fecha_encontrada) = ?", t_date, repeticiones)
+        imprimir_resultado("Rango semiabierto + índice", t_rango, repeticiones)
+        print(f"\n📊 Aceleración: x{t_date / t_rango:.1f}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+# ============================================================================
+# BENCHMARK 4: PK DE TEXTO VS HUELLA DE 64 BITS
+# ============================================================================
+
+def _tamano_btrees(db_name):
+    """Bytes ocupados por cada B-tree (tabla o índice) según dbstat"""
+    conn = sqlite3.connect(db_name)
+    filas = conn.execute("""
+        SELECT name, SUM(pgsize) FROM dbstat GROUP BY name
+    """).fetchall()
+    conn.close()
+    return dict(filas)
+
+
+def benchmark_claves(cantidad=200000, consultas=50000):
+    """Compara id TEXT PRIMARY KEY con la clave entera de 64 bits"""
+    print("\n" + "="*70)
+    print(f"🧪 PK DE TEXTO VS HUELLA DE 64 BITS ({cantidad} ofertas)")
+    print("="*70 + "\n")
+    
+    directorio = tempfile.mkdtemp(prefix="job_monitor_bench_")
+    try:
+        ofertas = ofertas_sinteticas(cantidad)
+        ahora = datetime.now()
+        
+        # Esquema anterior: el id de texto es la PK
+        db_texto = os.path.join(directorio, "texto.db")
+        conn = sqlite3.connect(db_texto)
+        conn.execute("""
+            CREATE TABLE ofertas (
+                id TEXT PRIMARY KEY, titulo TEXT, empresa TEXT, url TEXT,
+                salario TEXT, portal TEXT, fecha_publicacion TIMESTAMP,
+                fecha_encontrada TIMESTAMP
+            )
+        """)
+        # Fila del monitor sin la huella ni las columnas del detalle
+        conn.executemany(
+            "INSERT INTO ofertas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [DatabaseManager._fila_oferta(o, ahora)[1:9] for o in ofertas]
+        )
+        conn.commit()
+        conn.close()
+        
+        # Esquema nuevo: DatabaseManager con clave = huella
+        db_huella = os.path.join(directorio, "huella.db")
+        db = DatabaseManager(db_huella)
+        db.registrar_ofertas_nuevas(ofertas)
+        db.cerrar()
+        
+        texto = _tamano_btrees(db_texto)
+        huella = _tamano_btrees(db_huella)
+        indice_pk = texto.get("sqlite_autoindex_ofertas_1", 0)
+        print(f"   • PK de texto: tabla {texto['ofertas'] / 1024:.0f} KB "
+              f"+ índice de la PK {indice_pk / 1024:.0f} KB")
+        print(f"   • Huella:      tabla {huella['ofertas'] / 1024:.0f} KB (la PK es el rowid) "
+              f"+ índice de id {huella.get('idx_ofertas_id', 0) / 1024:.0f} KB "
+              f"(para los scripts que buscan por id)\n")
+        
+        muestra = [ofertas[(i * 7919) % cantidad]["id"] for i in range(consultas)]
+        
+        conn = sqlite3.connect(db_texto)
+        
+        def buscar_texto():
+            for oferta_id in muestra:
+                conn.execute("SELECT 1 FROM ofertas WHERE id = ?", (oferta_id,)).fetchone()
+        
+        t_texto = cronometrar(buscar_texto)
+        conn.close()
+        
+        conn = sqlite3.connect(db_huella)
+        huellas = [huella_oferta(oferta_id) for oferta_id in muestra]
+        
+        def buscar_huella():
+            for clave in huellas:
+                conn.execute("SELECT 1 FROM ofertas WHERE clave = ?", (clave,)).fetchone()
+        
+        t_huella = cronometrar(buscar_huella)
+        t_hash = cronometrar(lambda: [huella_oferta(oferta_id) for oferta_id in muestra])
+        conn.close()
+        
+        imprimir_resultado("Búsqueda por id TEXT", t_texto, consultas)
+        imprimir_resultado("Búsqueda por huella", t_huella, consultas)
+        imprimir_resultado("Cálculo de la huella (Python)", t_hash, consultas)
+        print(f"\n📊 Aceleración de la búsqueda: x{t_texto / t_huella:.1f}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+# ============================================================================
+# BENCHMARK 5: BÚSQUEDA FTS5 VS LIKE
+# ============================================================================
+
+def _ofertas_con_texto(inicio, cantidad):
+    """Ofertas sintéticas con títulos variados para la búsqueda de texto"""
+    tecnologias = ["Java", "Spring Boot", "Kafka", "Python", "Django", "Go",
+                   "Node.js", "AWS", "Kubernetes", "PostgreSQL", "React", "C#"]
+    roles = ["Backend Developer", "Software Engineer", "Desarrollador",
+             "Arquitecto", "DevOps Engineer", "Tech Lead"]
+    ofertas = ofertas_sinteticas(cantidad, prefijo=f"texto{inicio}")
+    
+    for i, oferta in enumerate(ofertas, inicio):
+        oferta["titulo"] = (f"{roles[i % len(roles)]} {tecnologias[i % 12]} "
+                            f"{tecnologias[(i * 7) % 12]} {i}")
+    
+    return ofertas
+
+
+def benchmark_busqueda(cantidad=1000000, repeticiones=20):
+    """Compara buscar_ofertas (FTS5) con un LIKE '%...%' sobre ofertas"""
+    print("\n" + "="*70)
+    print(f"🧪 BÚSQUEDA FTS5 VS LIKE ({cantidad} ofertas)")
+    print("="*70 + "\n")
+    
+    directorio = tempfile.mkdtemp(prefix="job_monitor_bench_")
+    try:
+        db = DatabaseManager(os.path.join(directorio, "busqueda.db"))
+        print("⏳ Generando histórico sintético (los triggers alimentan FTS5)...")
+        lote = 50000
+        for inicio in range(0, cantidad, lote):
+            db.registrar_ofertas_nuevas(_ofertas_con_texto(inicio, min(lote, cantidad - inicio)))
+        
+        texto = "spring boot kafka"
+        
+        def buscar_fts():
+            for _ in range(repeticiones):
+                db.buscar_ofertas(texto)
+        
+        def buscar_like():
+            for _ in range(repeticiones):
+                db.conn.execute("""
+                    SELECT titulo, empresa, url, salario, portal, fecha_encontrada
+                    FROM ofertas
+                    WHERE titulo LIKE '%spring%' AND titulo LIKE '%boot%'
+                      AND titulo LIKE '%kafka%'
+                    LIMIT 20
+                """).fetchall()
+        
+        t_fts = cronometrar(buscar_fts)
+        t_like = cronometrar(buscar_like)
+        db.cerrar()
+        
+        imprimir_resultado(f"FTS5 '{texto}'", t_fts, repeticiones)
+        imprimir_resultado(f"LIKE '%...%'", t_like, repeticiones)
+        print(f"\n📊 Aceleración: x{t_like / t_fts:.1f}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+# ============================================================================
+# BENCHMARK 6: SESIÓN HTTP EN FRÍO VS POOL CALIENTE
+# ============================================================================
+
+class _ManejadorPortal(BaseHTTPRequestHandler):
+    """Sirve siempre la misma página con keep-alive (HTTP/1.1)"""
+    
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Cabeceras y cuerpo van en dos escrituras
+    
+    def setup(self):
+        super().setup()
+        self.server.conexiones += 1
+    
+    def do_GET(self):
+        pagina = self.server.pagina
+        comprimir = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if comprimir:
+            pagina = self.server.pagina_gzip
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if comprimir:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(pagina)))
+        self.end_headers()
+        self.wfile.write(pagina)
+    
+    def log_message(self, *args):
+        pass
+
+
+def _servidor_local():
+    """Arranca un servidor HTTP local con la página de ejemplo de Indeed como respuesta"""
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ManejadorPortal)
+    servidor.daemon_threads = True
+    servidor.conexiones = 0
+    with open(os.path.join(DIRECTORIO_FIXTURES, "resultados_indeed.html"), "rb") as f:
+        servidor.pagina = f.read()
+    servidor.pagina_gzip = gzip.compress(servidor.pagina)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def benchmark_http(peticiones=200, url=None):
+    """Latencia por petición abriendo conexión cada vez vs reutilizando el pool
+    
+    Sin url se usa un servidor local (solo mide el handshake TCP); con una url
+    https real se ve además el coste del TLS, que es donde más se gana.
+    """
+    print("\n" + "="*70)
+    print(f"🧪 SESIÓN HTTP EN FRÍO VS POOL CALIENTE ({peticiones} peticiones)")
+    print("="*70 + "\n")
+    
+    servidor = None
+    if url is None:
+        servidor = _servidor_local()
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/jobs"
+    
+    def en_frio():
+        # Lo que hacía requests.get: una sesión (y conexión) nueva por petición
+        for _ in range(peticiones):
+            with crear_sesion_http() as sesion:
+                sesion.get(url).content
+    
+    sesion = crear_sesion_http()
+    sesion.get(url).content  # Calienta el pool: primera conexión fuera de la medida
+    
+    def en_caliente():
+        for _ in range(peticiones):
+            sesion.get(url).content
+    
+    try:
+        conexiones_antes = servidor.conexiones if servidor else 0
+        t_frio = cronometrar(en_frio)
+        conexiones_frio = servidor.conexiones - conexiones_antes if servidor else None
+        
+        conexiones_antes = servidor.conexiones if servidor else 0
+        t_caliente = cronometrar(en_caliente)
+        conexiones_caliente = servidor.conexiones - conexiones_antes if servidor else None
+    finally:
+        sesion.close()
+        if servidor:
+            servidor.shutdown()
+            servidor.server_close()
+    
+    imprimir_resultado("Conexión nueva por petición", t_frio, peticiones)
+    imprimir_resultado("Sesión compartida (keep-alive)", t_caliente, peticiones)
+    if servidor:
+        print(f"\n🔌 Conexiones TCP abiertas: {conexiones_frio} en frío, "
+              f"{conexiones_caliente} con el pool caliente")
+    print(f"📊 Aceleración: x{t_frio / t_caliente:.1f}")
+
+
+# ============================================================================
+# BENCHMARK 7: COMPRESIÓN Y PARSEO SOLO DE LAS TARJETAS
+# ============================================================================
+
+def _paginas_ejemplo():
+    """(portal, contenido) de las páginas de fixtures/, que sí traen tarjetas"""
+    paginas = []
+    for portal in PARSERS:
+        ruta = os.path.join(DIRECTORIO_FIXTURES, f"resultados_{portal}.html")
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                paginas.append((portal, f.read()))
+    return paginas
+
+
+def _pico_memoria(funcion, *args):
+    """Pico de memoria (bytes) reservado mientras se ejecuta la función"""
+    tracemalloc.start()
+    try:
+        funcion(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _arbol_completo(contenido):
+    """Lo que construían antes los parsers: el árbol de toda la página"""
+    return BeautifulSoup(contenido, "html.parser")
+
+
+def benchmark_compresion(peticiones=100):
+    """Bytes por la red sin compresión vs negociada, y memoria del parseo
+    
+    La memoria se mide con las páginas de fixtures/: árbol de toda la página
+    frente a los parsers actuales, que solo construyen el de las tarjetas de oferta.
+    """
+    print("\n" + "="*70)
+    print(f"🧪 COMPRESIÓN Y PARSEO SOLO DE LAS TARJETAS ({peticiones} peticiones)")
+    print("="*70 + "\n")
+    
+    servidor = _servidor_local()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/jobs"
+    
+    def descargar(sesion):
+        red = 0
+        for _ in range(peticiones):
+            with sesion.get(url, stream=True) as response:
+                response.content
+                red += response.raw.tell()
+        return red
+    
+    sin_comprimir = crear_sesion_http()
+    sin_comprimir.headers["Accept-Encoding"] = "identity"
+    comprimida = crear_sesion_http()
+    try:
+        inicio = time.perf_counter()
+        red_plana = descargar(sin_comprimir)
+        t_plana = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        red_comprimida = descargar(comprimida)
+        t_comprimida = time.perf_counter() - inicio
+    finally:
+        sin_comprimir.close()
+        comprimida.close()
+        servidor.shutdown()
+        servidor.server_close()
+    
+    imprimir_resultado("Sin compresión", t_plana, peticiones)
+    imprimir_resultado(f"{comprimida.headers['Accept-Encoding']}", t_comprimida, peticiones)
+    print(f"\n📦 Bytes por la red: {red_plana / 1024:,.1f} KB sin compresión, "
+          f"{red_comprimida / 1024:,.1f} KB comprimidos "
+          f"({1 - red_comprimida / red_plana:.1%} ahorrado)\n")
+    
+    for portal, contenido in _paginas_ejemplo():
+        ofertas = len(PARSERS[portal](contenido))
+        if not ofertas:
+            print(f"   ⚠️  {portal}: la página no tiene ofertas, la comparación no vale")
+        completo = _pico_memoria(_arbol_completo, contenido)
+        tarjetas = _pico_memoria(PARSERS[portal], contenido)
+        print(f"   • {portal:14} {len(contenido) / 1024:7.1f} KB de HTML, {ofertas} ofertas: pico "
+              f"{completo / 1024:8.1f} KB con el árbol completo, {tarjetas / 1024:8.1f} KB "
+              f"solo con las tarjetas (-{1 - tarjetas / completo:.0%})")
+
+
+# ============================================================================
+# BENCHMARK 8: VELOCIDAD DE PARSEO POR BACKEND
+# ============================================================================
+
+def _parsear_todas(paginas):
+    """Ofertas de cada página, sin la fecha (cambia en cada llamada)"""
+    return [
+        [{k: v for k, v in oferta.items() if k != "fecha_publicacion"}
+         for oferta in PARSERS[portal](contenido)]
+        for portal, contenido in paginas
+    ]
+
+
+def benchmark_parseo(repeticiones=200):
+    """Páginas/s y MB/s de cada HTML_PARSER sobre las páginas de fixtures/
+    
+    Además comprueba que cada backend saca las mismas ofertas que html.parser.
+    """
+    print("\n" + "="*70)
+    print(f"🧪 VELOCIDAD DE PARSEO POR BACKEND ({repeticiones} repeticiones)")
+    print("="*70 + "\n")
+    
+    paginas = _paginas_ejemplo()
+    if not paginas:
+        print(f"❌ No hay páginas de ejemplo en {DIRECTORIO_FIXTURES}")
+        return
+    
+    total_bytes = sum(len(contenido) for _, contenido in paginas) * repeticiones
+    total_paginas = len(paginas) * repeticiones
+    configurado = JobMonitorConfig.HTML_PARSER
+    referencia = None
+    resultados = {}
+    
+    try:
+        for backend in ["html.parser", "lxml", "selectolax"]:
+            JobMonitorConfig.HTML_PARSER = backend
+            if backend_html() != backend:
+                continue
+            
+            ofertas = _parsear_todas(paginas)
+            if referencia is None:
+                # Sin ofertas no se compara nada: "mismas ofertas" sería [] == []
+                vacias = [portal for (portal, _), lista in zip(paginas, ofertas) if not lista]
+                if len(vacias) == len(paginas):
+                    print("❌ Ninguna página tiene ofertas: no se puede comparar los backends")
+                    return
+                if vacias:
+                    print(f"   ⚠️  Sin ofertas (no se comparan): {', '.join(vacias)}\n")
+                referencia = ofertas
+            total = sum(len(lista) for lista in ofertas)
+            iguales = f"{total} ofertas, las mismas" if ofertas == referencia else "❌ ofertas distintas"
+            
+            segundos = cronometrar(
+                lambda: [PARSERS[portal](contenido)
+                         for _ in range(repeticiones) for portal, contenido in paginas]
+            )
+            resultados[backend] = segundos
+            imprimir_resultado(backend, segundos, total_paginas)
+            print(f"     {total_paginas / segundos:8.0f} páginas/s  "
+                  f"{total_bytes / segundos / 1024 / 1024:6.2f} MB/s  ({iguales})")
+    finally:
+        JobMonitorConfig.HTML_PARSER = configurado
+    
+    base = resultados.pop("html.parser")
+    for backend, segundos in resultados.items():
+        print(f"\n📊 {backend}: x{base / segundos:.1f} frente a html.parser")
+
+
+# ============================================================================
+# PUNTO DE ENTRADA
+# ============================================================================
+
+if __name__ == "__main__":
+    print("""
+    ╔═══════════════════════════════════════╗
+    ║     JOB MONITOR - BENCHMARKS          ║
+    ║  Rendimiento de datos y HTTP          ║
+    ╚═══════════════════════════════════════╝
+    """)
+    
+    print("¿Qué benchmark quieres ejecutar?")
+    print("1️⃣  Conexión por llamada vs persistente")
+    print("2️⃣  Oferta a oferta vs lotes")
+    print("3️⃣  Resumen diario: DATE() vs rango indexado")
+    print("4️⃣  PK de texto vs huella de 64 bits")
+    print("5️⃣  Búsqueda FTS5 vs LIKE")
+    print("6️⃣  Sesión HTTP en frío vs pool caliente")
+    print("7️⃣  Compresión y parseo solo de las tarjetas")
+    print("8️⃣  Velocidad de parseo por backend")
+    print("9️⃣  Todos\n")
+    
+    opcion = input("Tu opción (1-9): ").strip()
+    
+    if opcion in ["1", "9"]:
+        benchmark_conexiones()
+    
+    if opcion in ["2", "9"]:
+        benchmark_lotes()
+    
+    if opcion in ["3", "9"]:
+        benchmark_resumen_diario()
+    
+    if opcion in ["4", "9"]:
+        benchmark_claves()
+    
+    if opcion in ["5", "9"]:
+        benchmark_busqueda()
+    
+    if opcion in ["6", "9"]:
+        benchmark_http()
+    
+    if opcion in ["7", "9"]:
+        benchmark_compresion()
+    
+    if opcion in ["8", "9"]:
+        benchmark_parseo()
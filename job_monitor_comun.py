@@ -0,0 +1,180 @@
+"""
+JOB MONITOR - Código común de la base de datos
+job_monitor_txt_2.py y job_monitor_whatsapp.py comparten el mismo job_monitor.db:
+las claves, la reparación de filas y los contadores diarios deben ser idénticos
+"""
+
+import hashlib
+import re
+
+
+def huella_oferta(oferta_id):
+    """Huella de 64 bits (entero con signo, como INTEGER de SQLite) de un id"""
+    digest = hashlib.blake2b(oferta_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def salario_anual(texto):
+    """Salario anual en euros a partir del texto del portal (None si no hay cifra)"""
+    if not texto:
+        return None
+    texto = texto.lower()
+    if "hora" in texto:
+        return None
+    
+    cifras = []
+    for numero, miles in re.findall(r"(\d+(?:[.,]\d{3})*)\s*(k)?", texto):
+        valor = float(numero.replace(".", "").replace(",", ""))
+        if miles:
+            valor *= 1000
+        if valor >= 100:
+            cifras.append(valor)
+    if not cifras:
+        return None
+    
+    # Rango "25.000 - 32.000": punto medio
+    valor = sum(cifras[:2]) / len(cifras[:2])
+    if "mes" in texto or valor < 10000:
+        valor *= 12
+    return valor
+
+
+class BaseDatosOfertas:
+    """Parte común de los DatabaseManager: claves, inserción y contadores diarios
+    
+    La subclase aporta conectar(), transaccion(), _confirmar(),
+    SQL_INSERTAR_OFERTA y _fila_oferta()
+    """
+    
+    def _migrar_a_clave_hash(self, conn):
+        """Reconstruye una tabla ofertas con id TEXT PRIMARY KEY usando la huella"""
+        columnas = conn.execute("PRAGMA table_info(ofertas)").fetchall()
+        nombres = [columna[1] for columna in columnas]
+        if "clave" in nombres:
+            return
+        
+        print("🔧 Migrando la tabla ofertas a claves de 64 bits...")
+        
+        # Se conservan todas las columnas existentes (p.ej. enviada_whatsapp)
+        definiciones = []
+        for _, nombre, tipo, _, defecto, _ in columnas:
+            if nombre == "id":
+                definiciones.append("id TEXT NOT NULL")
+            elif defecto is not None:
+                definiciones.append(f"{nombre} {tipo} DEFAULT {defecto}")
+            else:
+                definiciones.append(f"{nombre} {tipo}")
+        lista = ", ".join(nombres)
+        
+        conn.execute("BEGIN")
+        try:
+            conn.execute("ALTER TABLE ofertas RENAME TO ofertas_texto")
+            conn.execute(f"""
+                CREATE TABLE ofertas (
+                    clave INTEGER PRIMARY KEY,
+                    {", ".join(definiciones)},
+                    clave_verificada INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute(f"""
+                INSERT OR IGNORE INTO ofertas (clave, {lista}, clave_verificada)
+                SELECT huella(id), {lista}, 1 FROM ofertas_texto
+            """)
+            conn.execute("DROP TABLE ofertas_texto")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def _reparar_claves(self, conn):
+        """Pone la huella a las filas que insertaron los scripts sin clave"""
+        # Los demás job_monitor_*.py insertan solo el id: SQLite les asigna
+        # un rowid cualquiera y clave_verificada se queda a 0
+        filas = conn.execute("""
+            SELECT clave, id, fecha_encontrada, portal, salario
+            FROM ofertas WHERE clave_verificada = 0
+        """).fetchall()
+        
+        if filas:
+            with self.transaccion():
+                nuevas = []
+                for clave, oferta_id, fecha, portal, salario in filas:
+                    correcta = huella_oferta(oferta_id)
+                    existe = conn.execute(
+                        "SELECT 1 FROM ofertas WHERE clave = ?", (correcta,)
+                    ).fetchone()
+                    if clave != correcta and existe:
+                        # Ya la teníamos: la fila insertada sin clave sobra
+                        conn.execute("DELETE FROM ofertas WHERE clave = ?", (clave,))
+                    else:
+                        conn.execute(
+                            "UPDATE ofertas SET clave = ?, clave_verificada = 1 WHERE clave = ?",
+                            (correcta, clave)
+                        )
+                        nuevas.append((fecha, portal, salario))
+                
+                # Esos scripts no llevan los contadores diarios
+                self._acumular_estadisticas(conn, nuevas)
+        
+        # Los demás job_monitor_*.py buscan por id (WHERE id = ?) en la misma BD:
+        # sin índice cada búsqueda recorrería la tabla. Se crea después de
+        # reparar, que borra los id repetidos que hayan podido dejar
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_ofertas_id ON ofertas (id)")
+        self._confirmar()
+    
+    def _insertar_nuevas(self, conn, candidatas, ahora):
+        """Inserta las candidatas y devuelve las que de verdad eran nuevas"""
+        # OR IGNORE: otro proceso pudo guardar la oferta después de consultarla.
+        # Solo son nuevas (y se cuentan) las filas que sí se insertan
+        insertar = self.SQL_INSERTAR_OFERTA.replace("INSERT", "INSERT OR IGNORE", 1)
+        nuevas = [
+            oferta for oferta in candidatas
+            if conn.execute(insertar, self._fila_oferta(oferta, ahora)).rowcount
+        ]
+        self._acumular_estadisticas(
+            conn,
+            [(ahora, oferta["portal"], oferta["salario"]) for oferta in nuevas]
+        )
+        return nuevas
+    
+    SQL_ACUMULAR_ESTADISTICAS = """
+        INSERT INTO estadisticas_diarias
+            (dia, portal, ofertas, con_salario, salario_suma, salario_min, salario_max)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (dia, portal) DO UPDATE SET
+            ofertas = ofertas + excluded.ofertas,
+            con_salario = con_salario + excluded.con_salario,
+            salario_suma = salario_suma + excluded.salario_suma,
+            salario_min = MIN(COALESCE(salario_min, excluded.salario_min),
+                              COALESCE(excluded.salario_min, salario_min)),
+            salario_max = MAX(COALESCE(salario_max, excluded.salario_max),
+                              COALESCE(excluded.salario_max, salario_max))
+    """
+    
+    def _acumular_estadisticas(self, conn, filas):
+        """Suma (fecha_encontrada, portal, salario) a los contadores diarios"""
+        grupos = {}
+        for fecha, portal, salario in filas:
+            clave = (str(fecha)[:10], portal or "desconocido")
+            grupo = grupos.setdefault(clave, [0, 0, 0.0, None, None])
+            grupo[0] += 1
+            valor = salario_anual(salario)
+            if valor is not None:
+                grupo[1] += 1
+                grupo[2] += valor
+                grupo[3] = valor if grupo[3] is None else min(grupo[3], valor)
+                grupo[4] = valor if grupo[4] is None else max(grupo[4], valor)
+        
+        conn.executemany(
+            self.SQL_ACUMULAR_ESTADISTICAS,
+            [clave + tuple(grupo) for clave, grupo in grupos.items()]
+        )
+    
+    def recalcular_estadisticas(self):
+        """Reconstruye los contadores diarios desde la tabla ofertas"""
+        with self.transaccion() as conn:
+            conn.execute("DELETE FROM estadisticas_diarias")
+            self._acumular_estadisticas(
+                conn,
+                conn.execute("SELECT fecha_encontrada, portal, salario FROM ofertas")
+            )
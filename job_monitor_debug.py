@@ -4,7 +4,8 @@ Prueba de scraping con información detallada
 """
 
 import requests
-from bs4 import BeautifulSoup
+import time
+from bs4 import BeautifulSoup, FeatureNotFound
 from datetime import datetime
 
 # ============================================================================
@@ -14,10 +15,23 @@ from datetime import datetime
 class DebugScraper:
     """Scraper con información detallada para debugging"""
     
-    def __init__(self):
+    def __init__(self, parser="html.parser"):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        self.parser = parser  # "html.parser" o "lxml" (pip install lxml)
+    
+    def _soup(self, contenido):
+        """Árbol de la página con el parser elegido, mostrando lo que tarda"""
+        inicio = time.perf_counter()
+        try:
+            soup = BeautifulSoup(contenido, self.parser)
+        except FeatureNotFound:
+            print(f"⚠️  El parser '{self.parser}' necesita pip install {self.parser}: se usa html.parser")
+            self.parser = "html.parser"
+            soup = BeautifulSoup(contenido, self.parser)
+        print(f"   • Parseo ({self.parser}): {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        return soup
     
     def test_indeed(self, titulo_busqueda):
         """Prueba Indeed con información detallada"""
@@ -54,7 +68,7 @@ class DebugScraper:
             print(f"   • Tamaño: {len(response.content)} bytes")
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 
                 # Buscar diferentes selectores
                 print(f"\n🔎 Buscando ofertas con diferentes selectores:\n")
@@ -160,7 +174,7 @@ class DebugScraper:
             print(f"   • Tamaño: {len(response.content)} bytes")
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 
                 print(f"\n🔎 Buscando ofertas:\n")
                 
@@ -227,7 +241,7 @@ class DebugScraper:
             print(f"   • Tamaño: {len(response.content)} bytes")
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 
                 print(f"\n🔎 Buscando ofertas:\n")
                 
@@ -282,8 +296,11 @@ if __name__ == "__main__":
     
     print(f"\n✅ Testearemos con: '{titulo}'\n")
     
+    # Parser de HTML ("lxml" si está instalado es bastante más rápido)
+    parser = input("Parser de HTML (html.parser / lxml) [html.parser]: ").strip() or "html.parser"
+    
     # Crear debugger
-    debugger = DebugScraper()
+    debugger = DebugScraper(parser)
     
     # Preguntar qué portal probar
     print("¿Cuál portal quieres probar?")
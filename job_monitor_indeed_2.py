@@ -10,8 +10,9 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import sqlite3
+from contextlib import contextmanager
 import schedule
 
 # ============================================================================
@@ -35,11 +36,55 @@ class DatabaseManager:
     
     def __init__(self, db_name=JobMonitorConfig.DB_NAME):
         self.db_name = db_name
+        self.conn = None
+        self._en_transaccion = False
         self.crear_tablas()
     
+    def conectar(self):
+        """Devuelve la conexión persistente (la abre la primera vez)"""
+        if self.conn is None:
+            # Una sola conexión por proceso: sqlite3 cachea las sentencias
+            # preparadas por conexión, así que reutilizarla evita recompilarlas
+            self.conn = sqlite3.connect(self.db_name)
+            # WAL: las lecturas no bloquean la escritura y el commit es más barato
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        return self.conn
+    
+    def cerrar(self):
+        """Cierra la conexión persistente"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias operaciones en una única transacción explícita"""
+        conn = self.conectar()
+        
+        # Transacción anidada: la confirma la más externa
+        if self._en_transaccion:
+            yield conn
+            return
+        
+        self._en_transaccion = True
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._en_transaccion = False
+    
+    def _confirmar(self):
+        """Hace commit salvo que estemos dentro de transaccion()"""
+        if not self._en_transaccion:
+            self.conn.commit()
+    
     def crear_tablas(self):
         """Crea las tablas si no existen"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -53,21 +98,25 @@ class DatabaseManager:
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Índice para el resumen diario por rango de fechas
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_fecha_encontrada
+            ON ofertas (fecha_encontrada)
+        """)
+        
+        self._confirmar()
     
     def oferta_existe(self, oferta_id):
         """Verifica si la oferta ya está en la BD"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         cursor.execute("SELECT id FROM ofertas WHERE id = ?", (oferta_id,))
         resultado = cursor.fetchone()
-        conn.close()
         return resultado is not None
     
     def guardar_oferta(self, oferta):
         """Guarda una nueva oferta en la BD"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -82,21 +131,20 @@ class DatabaseManager:
             datetime.now()
         ))
         
-        conn.commit()
-        conn.close()
+        self._confirmar()
     
     def obtener_ofertas_del_dia(self):
         """Obtiene ofertas encontradas hoy"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
-        hoy = datetime.now().date()
+        hoy = datetime.combine(datetime.now().date(), datetime.min.time())
+        # Rango semiabierto sobre la columna sin funciones: usa el índice
         cursor.execute("""
             SELECT titulo, empresa, url, salario
             FROM ofertas 
-            WHERE DATE(fecha_encontrada) = ?
-        """, (hoy,))
+            WHERE fecha_encontrada >= ? AND fecha_encontrada < ?
+        """, (hoy, hoy + timedelta(days=1)))
         ofertas = cursor.fetchall()
-        conn.close()
         return ofertas
 
 
@@ -762,15 +810,16 @@ class JobMonitor:
         # Procesar todas las ofertas
         ofertas_nuevas = []
         
-        for oferta in todas_ofertas:
-            if not self.db.oferta_existe(oferta["id"]):
-                # Oferta nueva - guardar
-                self.db.guardar_oferta(oferta)
-                self.file_manager.guardar_oferta_txt(oferta)
-                ofertas_nuevas.append(oferta)
-                print(f"✅ Guardada: {oferta['titulo']}")
-            else:
-                print(f"⏭️  Duplicada: {oferta['titulo']}")
+        with self.db.transaccion():
+            for oferta in todas_ofertas:
+                if not self.db.oferta_existe(oferta["id"]):
+                    # Oferta nueva - guardar
+                    self.db.guardar_oferta(oferta)
+                    self.file_manager.guardar_oferta_txt(oferta)
+                    ofertas_nuevas.append(oferta)
+                    print(f"✅ Guardada: {oferta['titulo']}")
+                else:
+                    print(f"⏭️  Duplicada: {oferta['titulo']}")
         
         # Resumen
         print(f"\n{'='*70}")
@@ -830,6 +879,12 @@ class JobMonitor:
                 time.sleep(60)
         except KeyboardInterrupt:
             print("\n\n👋 Monitoreo detenido por el usuario")
+        finally:
+            self.cerrar()
+    
+    def cerrar(self):
+        """Libera la conexión a la BD"""
+        self.db.cerrar()
 
 
 # ============================================================================
@@ -878,6 +933,7 @@ if __name__ == "__main__":
     
     if opcion == "1":
         monitor.ejecutar_monitoreo()
+        monitor.cerrar()
         print("✅ Monitoreo completado")
         print(f"Ver ofertas en: {JobMonitorConfig.OFERTAS_FILE}")
     elif opcion == "2":
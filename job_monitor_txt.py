@@ -6,12 +6,13 @@ Fecha: 2025
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 import schedule
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import sqlite3
+from contextlib import contextmanager
 
 # ============================================================================
 # CONFIGURACIÓN INICIAL
@@ -25,6 +26,10 @@ class JobMonitorConfig:
     OFERTAS_FILE = "ofertas_nuevas.txt"
     RESUMEN_FILE = "resumen_diario.txt"
     
+    # Parser de las páginas: "html.parser" (sin dependencias) o "lxml"
+    # (pip install lxml): el mismo árbol de BeautifulSoup, varias veces más rápido
+    HTML_PARSER = "html.parser"
+    
     # Criterios de búsqueda
     CRITERIOS = {
         "salario_min": 25000,
@@ -47,11 +52,55 @@ class DatabaseManager:
     
     def __init__(self, db_name=JobMonitorConfig.DB_NAME):
         self.db_name = db_name
+        self.conn = None
+        self._en_transaccion = False
         self.crear_tablas()
     
+    def conectar(self):
+        """Devuelve la conexión persistente (la abre la primera vez)"""
+        if self.conn is None:
+            # Una sola conexión por proceso: sqlite3 cachea las sentencias
+            # preparadas por conexión, así que reutilizarla evita recompilarlas
+            self.conn = sqlite3.connect(self.db_name)
+            # WAL: las lecturas no bloquean la escritura y el commit es más barato
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        return self.conn
+    
+    def cerrar(self):
+        """Cierra la conexión persistente"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias operaciones en una única transacción explícita"""
+        conn = self.conectar()
+        
+        # Transacción anidada: la confirma la más externa
+        if self._en_transaccion:
+            yield conn
+            return
+        
+        self._en_transaccion = True
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._en_transaccion = False
+    
+    def _confirmar(self):
+        """Hace commit salvo que estemos dentro de transaccion()"""
+        if not self._en_transaccion:
+            self.conn.commit()
+    
     def crear_tablas(self):
         """Crea las tablas si no existen"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         
         # Tabla de ofertas ya procesadas
@@ -79,21 +128,29 @@ class DatabaseManager:
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Índices para los resúmenes por rango de fechas y por portal
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_fecha_encontrada
+            ON ofertas (fecha_encontrada)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_portal
+            ON ofertas (portal)
+        """)
+        
+        self._confirmar()
     
     def oferta_existe(self, oferta_id):
         """Verifica si la oferta ya está en la BD"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         cursor.execute("SELECT id FROM ofertas WHERE id = ?", (oferta_id,))
         resultado = cursor.fetchone()
-        conn.close()
         return resultado is not None
     
     def guardar_oferta(self, oferta):
         """Guarda una nueva oferta en la BD"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -111,32 +168,30 @@ class DatabaseManager:
             datetime.now()
         ))
         
-        conn.commit()
-        conn.close()
+        self._confirmar()
     
     def agregar_log(self, portal, accion, detalles=""):
         """Registra actividad en logs"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO logs (fecha, portal, accion, detalles)
             VALUES (?, ?, ?, ?)
         """, (datetime.now(), portal, accion, detalles))
-        conn.commit()
-        conn.close()
+        self._confirmar()
     
     def obtener_ofertas_del_dia(self):
         """Obtiene ofertas encontradas hoy"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
-        hoy = datetime.now().date()
+        hoy = datetime.combine(datetime.now().date(), datetime.min.time())
+        # Rango semiabierto sobre la columna sin funciones: usa el índice
         cursor.execute("""
             SELECT titulo, empresa, url, salario, portal 
             FROM ofertas 
-            WHERE DATE(fecha_encontrada) = ?
-        """, (hoy,))
+            WHERE fecha_encontrada >= ? AND fecha_encontrada < ?
+        """, (hoy, hoy + timedelta(days=1)))
         ofertas = cursor.fetchall()
-        conn.close()
         return ofertas
 
 
@@ -221,11 +276,22 @@ class FileManager:
 class PortalScraper:
     """Extrae ofertas de diferentes portales"""
     
-    def __init__(self):
+    def __init__(self, db=None):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager()
+    
+    @staticmethod
+    def _soup(contenido):
+        """Árbol de la página con HTML_PARSER (html.parser si falta lxml)"""
+        try:
+            return BeautifulSoup(contenido, JobMonitorConfig.HTML_PARSER)
+        except FeatureNotFound:
+            print(f"⚠️  HTML_PARSER = '{JobMonitorConfig.HTML_PARSER}' necesita "
+                  f"pip install {JobMonitorConfig.HTML_PARSER}: se usa html.parser")
+            JobMonitorConfig.HTML_PARSER = "html.parser"
+            return BeautifulSoup(contenido, "html.parser")
     
     def buscar_en_indeed(self):
         """Busca ofertas en Indeed"""
@@ -249,7 +315,7 @@ class PortalScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 jobs = soup.find_all("div", class_="job_seen_beacon")
                 
                 for job in jobs[:10]:  # Primeras 10
@@ -318,7 +384,7 @@ class PortalScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 jobs = soup.find_all("article", class_="offer")
                 
                 for job in jobs[:10]:
@@ -384,7 +450,7 @@ class PortalScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 jobs = soup.find_all("div", class_="offer-item")
                 
                 for job in jobs[:10]:
@@ -450,7 +516,7 @@ class JobMonitor:
     
     def __init__(self):
         self.db = DatabaseManager()
-        self.scraper = PortalScraper()
+        self.scraper = PortalScraper(db=self.db)
         self.file_manager = FileManager()
     
     def ejecutar_monitoreo(self):
@@ -466,15 +532,16 @@ class JobMonitor:
         
         ofertas_nuevas = []
         
-        # Procesar cada oferta
-        for oferta in todas_ofertas:
-            if not self.db.oferta_existe(oferta["id"]):
-                # Oferta nueva - guardar y guardar en TXT
-                self.db.guardar_oferta(oferta)
-                self.file_manager.guardar_oferta_txt(oferta)
-                ofertas_nuevas.append(oferta)
-            else:
-                print(f"⏭️  Oferta duplicada: {oferta['titulo']}")
+        # Procesar cada oferta (un único commit por ronda)
+        with self.db.transaccion():
+            for oferta in todas_ofertas:
+                if not self.db.oferta_existe(oferta["id"]):
+                    # Oferta nueva - guardar y guardar en TXT
+                    self.db.guardar_oferta(oferta)
+                    self.file_manager.guardar_oferta_txt(oferta)
+                    ofertas_nuevas.append(oferta)
+                else:
+                    print(f"⏭️  Oferta duplicada: {oferta['titulo']}")
         
         # Resumen
         if ofertas_nuevas:
@@ -536,6 +603,12 @@ class JobMonitor:
                 time.sleep(60)  # Verificar cada minuto
         except KeyboardInterrupt:
             print("\n\n👋 Monitoreo detenido por el usuario")
+        finally:
+            self.cerrar()
+    
+    def cerrar(self):
+        """Libera la conexión a la BD"""
+        self.db.cerrar()
 
 
 # ============================================================================
@@ -564,6 +637,7 @@ if __name__ == "__main__":
     
     if opcion == "1":
         monitor.ejecutar_monitoreo()
+        monitor.cerrar()
         print("✅ Monitoreo completado")
         print(f"Ver ofertas en: {JobMonitorConfig.OFERTAS_FILE}")
     elif opcion == "2":
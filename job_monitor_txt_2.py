@@ -5,13 +5,42 @@ Autor: Tu nombre
 Fecha: 2025
 """
 
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
 import schedule
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import base64
+import gzip
+import tempfile
 import sqlite3
+import hashlib
+import html
+import os
+import re
+import sys
+import queue
+import random
+import threading
+import tracemalloc
+import atexit
+from concurrent.futures import (
+    FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+)
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib3.util.request import ACCEPT_ENCODING
+from xml.etree import ElementTree
+
+from job_monitor_comun import BaseDatosOfertas, huella_oferta, salario_anual
 
 # ============================================================================
 # CONFIGURACIÓN INICIAL
@@ -22,9 +51,154 @@ class JobMonitorConfig:
     
     # Base de datos
     DB_NAME = "job_monitor.db"
+    DB_LOTE_IN = 500  # Ids por consulta IN (...) al filtrar ofertas nuevas
     OFERTAS_FILE = "ofertas_nuevas.txt"
     RESUMEN_FILE = "resumen_diario.txt"
     
+    # Índice en memoria de ofertas vistas (modo 24/7)
+    # Cada huella ocupa ~60 bytes en el set: 200.000 ids ≈ 12 MB
+    INDICE_MAX_IDS = 200000
+    
+    # Escritura de logs en segundo plano
+    LOGS_LOTE = 50  # Se vuelca al acumular este número de registros...
+    LOGS_INTERVALO = 5  # ...o cada estos segundos, lo que ocurra antes
+    
+    # Mantenimiento de la tabla logs
+    LOGS_RETENCION_DIAS = 90  # Los logs más antiguos se resumen por día y se borran
+    LOGS_ARCHIVO = None  # p.ej. "job_monitor_logs_archivo.db" para guardarlos en vez de borrarlos
+    
+    # Exportación columnar (requiere pyarrow)
+    EXPORT_DIR = "export"
+    EXPORT_TABLAS = ["ofertas", "logs", "rondas", "avistamientos"]
+    EXPORT_TAM_BLOQUE = 50000  # Filas por bloque: acota la memoria usada
+    EXPORT_PAGINAS_POR_PASO = 1000  # Páginas copiadas por paso del snapshot
+    
+    # Cliente HTTP compartido por todos los portales (keep-alive)
+    HTTP_TIMEOUT = (5, 10)  # Segundos (conexión, lectura) si la llamada no indica otro
+    HTTP_POOL_HOSTS = 10  # Hosts distintos con pool propio
+    HTTP_POOL_CONEXIONES = 2  # Conexiones reutilizables por host...
+    HTTP_POOL_POR_HOST = {  # ...salvo en estos, que reciben más peticiones
+        "https://es.indeed.com": 4,
+        "https://www.infojobs.net": 4,
+        "https://www.computrabajo.com": 4
+    }
+    
+    # Ritmo por host (token bucket) y reintentos ante 429/503
+    HTTP_PETICIONES_POR_SEGUNDO = 0.5  # Ritmo sostenido por host...
+    HTTP_RAFAGA = 3  # ...con hasta estas peticiones seguidas sin esperar
+    HTTP_REINTENTOS = 3  # Reintentos de una petición con 429/503
+    HTTP_ESPERA_BASE = 2  # Segundos; se duplica en cada reintento (+ jitter)
+    HTTP_ESPERA_MAX = 60  # Un Retry-After mayor no se espera: se deja para otra ronda
+    HTTP_CIRCUITO_FALLOS = 3  # Peticiones seguidas fallidas (ya sin reintentos) que aparcan el host...
+    HTTP_CIRCUITO_ENFRIAMIENTO = 6 * 3600  # ...durante estos segundos
+    
+    # Caché en disco de las búsquedas (GET condicional con ETag/Last-Modified)
+    HTTP_CACHE_DIR = "http_cache"  # None para desactivarla
+    HTTP_CACHE_MAX_BYTES = 20 * 1024 * 1024  # Se descartan las menos usadas al pasarse
+    
+    # Peticiones idénticas simultáneas (p.ej. de perfiles que se solapan) se
+    # hacen una sola vez; el resultado se reutiliza además estos segundos
+    HTTP_COMPARTIR_TTL = 30
+    
+    # Casetes: respuestas grabadas para ejecutar el monitor sin red
+    HTTP_CASETE_LATENCIA = 0.0  # Segundos añadidos a cada respuesta reproducida
+    
+    # Búsqueda simultánea en los portales
+    SCRAPER_MOTOR = "hilos"  # "hilos" o "asyncio" (requiere aiohttp)
+    SCRAPER_HILOS = 3  # Portales consultados a la vez
+    SCRAPER_HILOS_MAX = 32  # Hilos como máximo: las búsquedas colgadas retienen el suyo
+    SCRAPER_TIMEOUT_PORTAL = 60  # Segundos; después el portal se descarta en esa ronda
+    SCRAPER_MAX_PAGINAS = 5  # Páginas de resultados como máximo por búsqueda
+    ASYNC_CONCURRENCIA = 10  # Peticiones en vuelo a la vez con el motor asyncio
+    ASYNC_PROCESOS_PARSEO = 0  # >0: parsea el HTML en procesos aparte; 0: en hilos
+    
+    # Parseo de las páginas de resultados: "html.parser" (BeautifulSoup, sin
+    # dependencias), "lxml" o "selectolax" (pip install lxml / selectolax).
+    # Devuelven las mismas ofertas; sin el paquete se usa html.parser
+    HTML_PARSER = "html.parser"
+    
+    # Página de detalle de las ofertas nuevas (salario, descripción, remoto)
+    DETALLE_ACTIVO = False  # Una petición más por oferta nueva (al ritmo del limitador)
+    DETALLE_HILOS = 4  # Páginas de detalle descargadas a la vez
+    DETALLE_MAX_DESCRIPCION = 4000  # Caracteres de descripción que se guardan
+    DETALLE_CACHE_DIAS = 30  # Detalles guardados por URL; mantenimiento purga los más antiguos
+    
+    # Portales con "tipo": "feed" (RSS, Atom o JSON)
+    FEED_TAM_BLOQUE = 16 * 1024  # Bytes que se pasan al parser de cada vez
+    HTTP_MEDIR_MEMORIA = False  # Pico de memoria de cada ronda con tracemalloc (más lento)
+    HTTP_CABECERAS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "es-ES,es;q=0.9,en;q=0.8"
+    }
+    
+    # Portales a monitorear (la búsqueda va en el parámetro "q" salvo que
+    # "busqueda" indique otro; None = el portal no admite búsqueda)
+    PORTALES = {
+        "indeed": {
+            "nombre": "Indeed",
+            "url": "https://es.indeed.com/jobs",
+            "parametros": {"radius": "0", "jt": "fulltime"},
+            "ubicacion": "l",
+            "paginacion": {"parametro": "start", "inicio": 0, "paso": 10},
+            # Selectores CSS de la página de detalle (se usa el primero que exista)
+            "detalle": {
+                "descripcion": ["#jobDescriptionText"],
+                "salario": ["#salaryInfoAndJobType", "[data-testid='jobsearch-OtherJobDetailsContainer']"],
+                "ubicacion": ["[data-testid='inlineHeader-companyLocation']",
+                              "[data-testid='job-location']"]
+            }
+        },
+        "infojobs": {
+            "nombre": "InfoJobs",
+            "url": "https://www.infojobs.net/search",
+            "parametros": {"c": "47"},  # Código de España (sin búsqueda por ubicación)
+            "paginacion": {"parametro": "page", "inicio": 1, "paso": 1},
+            "detalle": {
+                "descripcion": ["[class*='OfferDetail-description']", "#prefijoDescripcion1"],
+                "salario": ["[class*='OfferDetailHeader-salary']", "[class*='salary']"],
+                "ubicacion": ["[class*='OfferDetailHeader-detailsList']"]
+            }
+        },
+        "computrabajo": {
+            "nombre": "Computrabajo",
+            "url": "https://www.computrabajo.com/search/jobs",
+            "parametros": {},
+            "ubicacion": "location",
+            "paginacion": {"parametro": "p", "inicio": 1, "paso": 1},
+            "detalle": {
+                "descripcion": ["div[div-link='oferta']", ".box_detail", ".description"],
+                "salario": ["[class*='salario']", "[class*='salary']"],
+                "ubicacion": ["[class*='modalidad']", ".box_resume"]
+            }
+        },
+        # Feed RSS de una categoría: no admite búsqueda, trae todas las ofertas
+        # de la categoría (sea cual sea el título buscado) en una sola petición
+        # y sin HTML que parsear. "separador_empresa": los títulos vienen como
+        # "Empresa: Puesto", p.ej.
+        # "weworkremotely": {"nombre": "We Work Remotely", "tipo": "feed",
+        #                    "url": "https://weworkremotely.com/categories/remote-back-end-programming-jobs.rss",
+        #                    "busqueda": None, "parametros": {},
+        #                    "separador_empresa": ": ", "remoto": True},
+        # Feed JSON: "formato": "json", "elementos" es la ruta hasta la lista de
+        # ofertas y "campos" dice dónde está cada dato, p.ej.
+        # "remotive": {"nombre": "Remotive", "tipo": "feed", "formato": "json",
+        #              "url": "https://remotive.com/api/remote-jobs", "busqueda": "search",
+        #              "parametros": {}, "elementos": "jobs", "remoto": True,
+        #              "campos": {"id": ["id"], "titulo": ["title"], "empresa": ["company_name"],
+        #                         "url": ["url"], "salario": ["salary"],
+        #                         "fecha": ["publication_date"], "descripcion": ["description"]}}
+    }
+    
+    # Ubicaciones por defecto (parámetro "ubicacion" de cada portal)
+    UBICACIONES = ["Spain"]
+    
+    # Perfiles de búsqueda: cada uno cruza sus títulos con sus ubicaciones en
+    # sus portales (todos si no indica). Se suman al título pedido al arrancar.
+    # p.ej. {"nombre": "java", "titulos": ["backend java", "spring boot"],
+    #        "ubicaciones": ["Madrid", "Spain"], "portales": ["indeed"]}
+    PERFILES = []
+    
     # Criterios de búsqueda - SE CONFIGURA DINÁMICAMENTE
     CRITERIOS = {
         "salario_min": 25000,
@@ -42,32 +216,286 @@ class JobMonitorConfig:
 # MANEJO DE BASE DE DATOS
 # ============================================================================
 
-class DatabaseManager:
+def resumen_estadistica(estadistica):
+    """Una línea legible con los contadores de un portal en un día"""
+    linea = f"🌐 {estadistica['portal']}: {estadistica['ofertas']} ofertas"
+    if estadistica["con_salario"]:
+        euros = lambda valor: f"{valor:,.0f}".replace(",", ".") + " €"
+        linea += (f", {estadistica['con_salario']} con salario "
+                  f"(media {euros(estadistica['salario_medio'])}, "
+                  f"{euros(estadistica['salario_min'])} - {euros(estadistica['salario_max'])})")
+    return linea
+
+
+class IndiceOfertasVistas:
+    """Conjunto en memoria con las huellas de las ofertas ya guardadas"""
+    
+    def __init__(self, max_ids=JobMonitorConfig.INDICE_MAX_IDS):
+        self.max_ids = max_ids
+        self.huellas = set()
+        # Si se supera max_ids deja de ser completo: un fallo ya no
+        # garantiza que la oferta sea nueva y hay que preguntar a la BD
+        self.completo = True
+        self.aciertos = 0
+        self.consultas_bd = 0
+    
+    def agregar(self, oferta_id):
+        """Añade un id al índice (si queda sitio)"""
+        self.agregar_huella(huella_oferta(oferta_id))
+    
+    def agregar_huella(self, huella):
+        """Añade una huella ya calculada (p.ej. la columna clave de la BD)"""
+        if len(self.huellas) >= self.max_ids:
+            self.completo = False
+            return
+        self.huellas.add(huella)
+    
+    def resolver(self, ids):
+        """Separa los ids conocidos de los que hay que comprobar en la BD"""
+        conocidos = set()
+        pendientes = []
+        
+        for oferta_id in ids:
+            if huella_oferta(oferta_id) in self.huellas:
+                conocidos.add(oferta_id)
+                self.aciertos += 1
+            elif self.completo:
+                self.aciertos += 1  # Seguro que es nueva
+            else:
+                pendientes.append(oferta_id)
+                self.consultas_bd += 1
+        
+        return conocidos, pendientes
+    
+    def estadisticas(self):
+        """Devuelve un resumen con la tasa de acierto del índice"""
+        total = self.aciertos + self.consultas_bd
+        return {
+            "ids": len(self.huellas),
+            "completo": self.completo,
+            "consultas": total,
+            "aciertos": self.aciertos,
+            "consultas_bd": self.consultas_bd,
+            "tasa_acierto": self.aciertos / total if total else 0.0
+        }
+
+
+def _fecha_o_none(valor, tipo):
+    """Convierte un TIMESTAMP/DATE de SQLite a datetime/date (None si no se puede)"""
+    try:
+        fecha = datetime.fromisoformat(str(valor))
+    except (TypeError, ValueError):
+        return None
+    return fecha if str(tipo).startswith("timestamp") else fecha.date()
+
+
+class EscritorLogs:
+    """Hilo en segundo plano que guarda los logs en lotes"""
+    
+    def __init__(self, db_name, tam_lote=JobMonitorConfig.LOGS_LOTE,
+                 intervalo=JobMonitorConfig.LOGS_INTERVALO):
+        self.db_name = db_name
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+        self.cola = queue.Queue()
+        self.escritos = 0
+        self.hilo = threading.Thread(target=self._bucle, name="escritor-logs", daemon=True)
+        self.hilo.start()
+        # Vaciar la cola también si el proceso termina con Ctrl+C
+        atexit.register(self.cerrar)
+    
+    def agregar(self, portal, accion, detalles=""):
+        """Encola un registro (no toca la BD)"""
+        self.cola.put((datetime.now(), portal, accion, detalles))
+    
+    def cerrar(self):
+        """Vuelca lo pendiente y detiene el hilo"""
+        # Cerrado a mano (p.ej. en mantenimiento): el handler ya no hace falta
+        atexit.unregister(self.cerrar)
+        if self.hilo.is_alive():
+            self.cola.put(None)
+            self.hilo.join()
+    
+    def _bucle(self):
+        """Acumula registros y los vuelca por tamaño o por tiempo"""
+        # Conexión propia: las de sqlite3 no se comparten entre hilos
+        conn = sqlite3.connect(self.db_name)
+        pendientes = []
+        limite = time.monotonic() + self.intervalo
+        activo = True
+        
+        try:
+            while activo:
+                try:
+                    registro = self.cola.get(timeout=max(0, limite - time.monotonic()))
+                    if registro is None:
+                        activo = False
+                    else:
+                        pendientes.append(registro)
+                except queue.Empty:
+                    pass
+                
+                vencido = time.monotonic() >= limite
+                if pendientes and (not activo or vencido or len(pendientes) >= self.tam_lote):
+                    self._volcar(conn, pendientes)
+                    pendientes = []
+                if vencido:
+                    limite = time.monotonic() + self.intervalo
+        finally:
+            conn.close()
+    
+    def _volcar(self, conn, registros):
+        """Inserta un lote de registros con un único commit"""
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO logs (fecha, portal, accion, detalles)
+                    VALUES (?, ?, ?, ?)
+                """, registros)
+            self.escritos += len(registros)
+        except sqlite3.Error as e:
+            print(f"⚠️ Error guardando {len(registros)} logs: {e}")
+
+
+class DatabaseManager(BaseDatosOfertas):
     """Gestiona la base de datos SQLite local"""
     
     def __init__(self, db_name=JobMonitorConfig.DB_NAME):
         self.db_name = db_name
+        self.conn = None
+        self._en_transaccion = False
+        self.indice = None
+        self._sin_confirmar = set()  # Ids guardados en la transacción abierta
+        self.escritor_logs = None
+        self._hilo_conn = None
+        self._lectura = threading.local()
+        self._conexiones_lectura = []  # Las de _lectura, para cerrarlas en cerrar()
+        self._bloqueo_lectura = threading.Lock()
         self.crear_tablas()
     
+    def conectar(self):
+        """Devuelve la conexión persistente (la abre la primera vez)"""
+        if self.conn is None:
+            # Una sola conexión por proceso: sqlite3 cachea las sentencias
+            # preparadas por conexión, así que reutilizarla evita recompilarlas
+            self.conn = sqlite3.connect(self.db_name)
+            # WAL: las lecturas no bloquean la escritura y el commit es más barato
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            # Permite calcular la huella dentro de SQL (migración)
+            self.conn.create_function("huella", 1, huella_oferta, deterministic=True)
+            self._hilo_conn = threading.get_ident()
+        return self.conn
+    
+    def _conexion_lectura(self):
+        """La conexión persistente o, desde otro hilo, una propia de ese hilo"""
+        # Los hilos del scraper consultan ids conocidos mientras paginan
+        if self.conn is None or threading.get_ident() == self._hilo_conn:
+            return self.conectar()
+        conn = getattr(self._lectura, "conn", None)
+        if conn is None:
+            # Solo la usa su hilo, pero cerrar() la cierra desde el principal
+            conn = sqlite3.connect(self.db_name, check_same_thread=False)
+            self._lectura.conn = conn
+            with self._bloqueo_lectura:
+                self._conexiones_lectura.append(conn)
+        return conn
+    
+    def iniciar_escritor_logs(self):
+        """Pasa agregar_log a modo asíncrono (lotes en segundo plano)"""
+        if self.escritor_logs is None:
+            self.escritor_logs = EscritorLogs(self.db_name)
+        return self.escritor_logs
+    
+    def cerrar(self):
+        """Cierra la conexión persistente y las de lectura de los otros hilos"""
+        if self.escritor_logs is not None:
+            self.escritor_logs.cerrar()
+            self.escritor_logs = None
+        with self._bloqueo_lectura:
+            conexiones, self._conexiones_lectura = self._conexiones_lectura, []
+            self._lectura = threading.local()
+        for conn in conexiones:
+            conn.close()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias operaciones en una única transacción explícita"""
+        conn = self.conectar()
+        
+        # Transacción anidada: la confirma la más externa
+        if self._en_transaccion:
+            yield conn
+            return
+        
+        self._en_transaccion = True
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._en_transaccion = False
+            guardadas, self._sin_confirmar = self._sin_confirmar, set()
+        
+        # Solo tras el commit: si se deshace, las ofertas siguen siendo nuevas
+        self._marcar_guardadas(guardadas)
+    
+    def _confirmar(self):
+        """Hace commit salvo que estemos dentro de transaccion()"""
+        if not self._en_transaccion:
+            self.conn.commit()
+    
     def crear_tablas(self):
         """Crea las tablas si no existen"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         
         # Tabla de ofertas ya procesadas
+        # clave = huella de 64 bits del id: la PK es un entero fijo (alias del
+        # rowid) en vez de un texto largo; el id original se guarda aparte
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS ofertas (
-                id TEXT PRIMARY KEY,
+                clave INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
                 titulo TEXT,
                 empresa TEXT,
                 url TEXT,
                 salario TEXT,
                 portal TEXT,
                 fecha_publicacion TIMESTAMP,
-                fecha_encontrada TIMESTAMP
+                fecha_encontrada TIMESTAMP,
+                clave_verificada INTEGER DEFAULT 0,
+                descripcion TEXT,
+                remoto INTEGER
             )
         """)
         
+        # BDs creadas con la versión anterior (id TEXT PRIMARY KEY)
+        self._migrar_a_clave_hash(conn)
+        
+        # BDs anteriores a las páginas de detalle
+        columnas = [columna[1] for columna in conn.execute("PRAGMA table_info(ofertas)")]
+        if "descripcion" not in columnas:
+            cursor.execute("ALTER TABLE ofertas ADD COLUMN descripcion TEXT")
+        if "remoto" not in columnas:
+            cursor.execute("ALTER TABLE ofertas ADD COLUMN remoto INTEGER")
+        
+        # Detalle ya parseado de cada URL de oferta: no se vuelve a descargar
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS detalles (
+                url TEXT PRIMARY KEY,
+                salario TEXT,
+                descripcion TEXT,
+                remoto INTEGER,
+                fecha TIMESTAMP
+            ) WITHOUT ROWID
+        """)
+        
         # Tabla de log de actividad
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS logs (
@@ -79,28 +507,390 @@ class DatabaseManager:
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Resumen por día/portal/acción de los logs ya purgados
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS logs_diarios (
+                dia DATE,
+                portal TEXT,
+                accion TEXT,
+                total INTEGER,
+                PRIMARY KEY (dia, portal, accion)
+            )
+        """)
+        
+        # Contadores por día/portal de las ofertas nuevas: se actualizan en la
+        # misma transacción que cada INSERT, así los resúmenes no leen ofertas
+        nueva_estadisticas = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'estadisticas_diarias'"
+        ).fetchone() is None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS estadisticas_diarias (
+                dia DATE,
+                portal TEXT,
+                ofertas INTEGER DEFAULT 0,
+                con_salario INTEGER DEFAULT 0,
+                salario_suma REAL DEFAULT 0,
+                salario_min REAL,
+                salario_max REAL,
+                PRIMARY KEY (dia, portal)
+            ) WITHOUT ROWID
+        """)
+        
+        # Cada ejecución de ejecutar_monitoreo y cada oferta vista en ella
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rondas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                inicio TIMESTAMP,
+                ofertas INTEGER,
+                nuevas INTEGER
+            )
+        """)
+        # Solo enteros + portal y agrupado por oferta: el historial de una
+        # oferta es un rango contiguo de la PK
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS avistamientos (
+                clave INTEGER,
+                ronda INTEGER,
+                portal TEXT,
+                posicion INTEGER,
+                PRIMARY KEY (clave, ronda)
+            ) WITHOUT ROWID
+        """)
+        
+        # Índices para los resúmenes por rango de fechas y por portal
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_fecha_encontrada
+            ON ofertas (fecha_encontrada)
+        """)
+        # Parcial: solo contiene las filas insertadas sin huella (normalmente ninguna)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_sin_verificar
+            ON ofertas (clave_verificada) WHERE clave_verificada = 0
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_portal
+            ON ofertas (portal)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_logs_fecha
+            ON logs (fecha)
+        """)
+        
+        self._confirmar()
+        self._crear_busqueda_texto(conn)
+        # También crea el índice único de id (ver BaseDatosOfertas)
+        self._reparar_claves(conn)
+        
+        # Primera vez con contadores: se calculan con el histórico existente
+        if nueva_estadisticas:
+            self.recalcular_estadisticas()
+    
+    def _crear_busqueda_texto(self, conn):
+        """Crea el índice FTS5 de títulos/empresas y los triggers que lo sincronizan"""
+        existia = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'ofertas_fts'"
+        ).fetchone()
+        
+        try:
+            # Contenido externo: el texto vive en ofertas, FTS5 solo guarda el índice
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS ofertas_fts USING fts5(
+                    titulo, empresa,
+                    content='ofertas', content_rowid='clave',
+                    tokenize='unicode61 remove_diacritics 2'
+                );
+                
+                CREATE TRIGGER IF NOT EXISTS ofertas_fts_insertar AFTER INSERT ON ofertas BEGIN
+                    INSERT INTO ofertas_fts (rowid, titulo, empresa)
+                    VALUES (new.clave, new.titulo, new.empresa);
+                END;
+                
+                CREATE TRIGGER IF NOT EXISTS ofertas_fts_borrar AFTER DELETE ON ofertas BEGIN
+                    INSERT INTO ofertas_fts (ofertas_fts, rowid, titulo, empresa)
+                    VALUES ('delete', old.clave, old.titulo, old.empresa);
+                END;
+                
+                CREATE TRIGGER IF NOT EXISTS ofertas_fts_actualizar
+                AFTER UPDATE OF clave, titulo, empresa ON ofertas BEGIN
+                    INSERT INTO ofertas_fts (ofertas_fts, rowid, titulo, empresa)
+                    VALUES ('delete', old.clave, old.titulo, old.empresa);
+                    INSERT INTO ofertas_fts (rowid, titulo, empresa)
+                    VALUES (new.clave, new.titulo, new.empresa);
+                END;
+            """)
+        except sqlite3.OperationalError as e:
+            # SQLite compilado sin FTS5: la búsqueda usará LIKE
+            print(f"⚠️  Búsqueda de texto completo no disponible: {e}")
+            return
+        
+        if not existia:
+            # Indexar las ofertas que ya había en la BD
+            conn.execute("INSERT INTO ofertas_fts (ofertas_fts) VALUES ('rebuild')")
+            conn.commit()
+    
+    def registrar_ronda(self, ofertas, nuevas, inicio=None):
+        """Guarda la ronda y un avistamiento por oferta (posición en su búsqueda)"""
+        filas = [
+            (huella_oferta(oferta["id"]), oferta["portal"], oferta.get("posicion"))
+            for oferta in ofertas
+        ]
+        
+        with self.transaccion() as conn:
+            cursor = conn.execute(
+                "INSERT INTO rondas (inicio, ofertas, nuevas) VALUES (?, ?, ?)",
+                (inicio or datetime.now(), len(ofertas), nuevas)
+            )
+            ronda = cursor.lastrowid
+            # OR IGNORE: la misma oferta puede salir dos veces en una ronda
+            conn.executemany("""
+                INSERT OR IGNORE INTO avistamientos (clave, ronda, portal, posicion)
+                VALUES (?, ?, ?, ?)
+            """, [(clave, ronda, portal, posicion) for clave, portal, posicion in filas])
+        
+        return ronda
+    
+    def permanencia_ofertas(self, limite=20):
+        """Ofertas que más rondas llevan publicadas, con su primera y última vez"""
+        conn = self.conectar()
+        cursor = conn.execute("""
+            SELECT o.titulo, o.empresa, o.portal,
+                   MIN(r.inicio), MAX(r.inicio), COUNT(*), AVG(a.posicion)
+            FROM avistamientos a
+            JOIN rondas r ON r.id = a.ronda
+            JOIN ofertas o ON o.clave = a.clave
+            GROUP BY a.clave
+            ORDER BY COUNT(*) DESC
+            LIMIT ?
+        """, (limite,))
+        return cursor.fetchall()
+    
+    def crear_snapshot(self, ruta):
+        """Copia la BD a otro fichero por pasos, sin bloquear al monitor"""
+        destino = sqlite3.connect(ruta)
+        try:
+            # Entre paso y paso se sueltan los locks: el monitor puede seguir escribiendo
+            self.conectar().backup(
+                destino,
+                pages=JobMonitorConfig.EXPORT_PAGINAS_POR_PASO,
+                sleep=0.01
+            )
+        finally:
+            destino.close()
+    
+    def exportar_columnar(self, directorio=JobMonitorConfig.EXPORT_DIR, formato="parquet",
+                          tam_bloque=JobMonitorConfig.EXPORT_TAM_BLOQUE):
+        """Exporta las tablas a Parquet o Arrow IPC por bloques desde un snapshot"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("❌ La exportación columnar necesita pyarrow: pip install pyarrow")
+            return {}
+        
+        os.makedirs(directorio, exist_ok=True)
+        ruta_snapshot = os.path.join(directorio, "snapshot.db")
+        self.crear_snapshot(ruta_snapshot)
+        
+        # Tipos Arrow a partir de los tipos declarados en SQLite
+        tipos = {"INTEGER": pa.int64(), "TIMESTAMP": pa.timestamp("us"),
+                 "DATE": pa.date32()}
+        
+        def columna(valores, tipo):
+            if tipo == pa.int64():
+                return pa.array(valores, pa.int64())
+            texto = pa.array([None if v is None else str(v) for v in valores], pa.string())
+            if tipo == pa.string():
+                return texto
+            try:
+                return texto.cast(tipo)
+            except pa.ArrowInvalid:
+                # Algún valor con formato raro: ese valor se exporta como nulo
+                return pa.array([_fecha_o_none(v, tipo) for v in valores], tipo)
+        
+        resultados = {}
+        snapshot = sqlite3.connect(ruta_snapshot)
+        try:
+            for tabla in JobMonitorConfig.EXPORT_TABLAS:
+                columnas = snapshot.execute(f"PRAGMA table_info({tabla})").fetchall()
+                if not columnas:
+                    continue
+                
+                esquema = pa.schema([
+                    (nombre, tipos.get(tipo.upper(), pa.string()))
+                    for _, nombre, tipo, _, _, _ in columnas
+                ])
+                extension = "parquet" if formato == "parquet" else "arrow"
+                ruta = os.path.join(directorio, f"{tabla}.{extension}")
+                
+                if formato == "parquet":
+                    escritor = pq.ParquetWriter(ruta, esquema, compression="zstd")
+                else:
+                    escritor = pa.ipc.new_file(ruta, esquema)
+                
+                total = 0
+                try:
+                    cursor = snapshot.execute(f"SELECT * FROM {tabla}")
+                    while True:
+                        filas = cursor.fetchmany(tam_bloque)
+                        if not filas:
+                            break
+                        bloque = pa.record_batch(
+                            [columna([fila[i] for fila in filas], campo.type)
+                             for i, campo in enumerate(esquema)],
+                            schema=esquema
+                        )
+                        escritor.write_batch(bloque)
+                        total += len(filas)
+                finally:
+                    escritor.close()
+                
+                resultados[tabla] = (ruta, total)
+        finally:
+            snapshot.close()
+            os.remove(ruta_snapshot)
+        
+        return resultados
+    
+    def buscar_ofertas(self, texto, limite=20):
+        """Busca por palabras en títulos y empresas de todo el histórico"""
+        conn = self.conectar()
+        
+        palabras = texto.split()
+        if not palabras:
+            return []
+        # Cada palabra entre comillas: "c++" o "node.js" no rompen la sintaxis FTS5
+        consulta = " ".join('"{}"'.format(p.replace('"', '""')) for p in palabras)
+        
+        try:
+            cursor = conn.execute("""
+                SELECT o.titulo, o.empresa, o.url, o.salario, o.portal, o.fecha_encontrada
+                FROM ofertas_fts
+                JOIN ofertas o ON o.clave = ofertas_fts.rowid
+                WHERE ofertas_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            """, (consulta, limite))
+        except sqlite3.OperationalError:
+            # Sin FTS5: búsqueda lineal
+            condiciones = " AND ".join(["(titulo || ' ' || empresa) LIKE ?"] * len(palabras))
+            cursor = conn.execute(f"""
+                SELECT titulo, empresa, url, salario, portal, fecha_encontrada
+                FROM ofertas
+                WHERE {condiciones}
+                ORDER BY fecha_encontrada DESC
+                LIMIT ?
+            """, [f"%{p}%" for p in palabras] + [limite])
+        
+        return cursor.fetchall()
+    
+    def mantenimiento(self, retencion_dias=JobMonitorConfig.LOGS_RETENCION_DIAS,
+                      archivo=JobMonitorConfig.LOGS_ARCHIVO):
+        """Resume y purga los logs antiguos y compacta la BD"""
+        conn = self.conectar()
+        hoy = datetime.combine(datetime.now().date(), datetime.min.time())
+        corte = hoy - timedelta(days=retencion_dias)
+        
+        # auto_vacuum solo cambia con un VACUUM completo: se hace una vez
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            print("🔧 Activando auto_vacuum incremental (VACUUM único)...")
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        
+        if archivo:
+            conn.execute("ATTACH DATABASE ? AS archivo", (archivo,))
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS archivo.logs (
+                    id INTEGER PRIMARY KEY,
+                    fecha TIMESTAMP,
+                    portal TEXT,
+                    accion TEXT,
+                    detalles TEXT
+                )
+            """)
+        
+        try:
+            with self.transaccion():
+                # Mismo corte para sumar y borrar: cada log se cuenta una sola vez
+                conn.execute("""
+                    INSERT INTO logs_diarios (dia, portal, accion, total)
+                    SELECT DATE(fecha), portal, accion, COUNT(*)
+                    FROM logs
+                    WHERE fecha < ?
+                    GROUP BY DATE(fecha), portal, accion
+                    ON CONFLICT (dia, portal, accion)
+                    DO UPDATE SET total = total + excluded.total
+                """, (corte,))
+                
+                if archivo:
+                    conn.execute("""
+                        INSERT OR IGNORE INTO archivo.logs
+                        SELECT id, fecha, portal, accion, detalles FROM logs WHERE fecha < ?
+                    """, (corte,))
+                
+                purgados = conn.execute("DELETE FROM logs WHERE fecha < ?", (corte,)).rowcount
+                
+                conn.execute(
+                    "DELETE FROM detalles WHERE fecha < ?",
+                    (hoy - timedelta(days=JobMonitorConfig.DETALLE_CACHE_DIAS),)
+                )
+        finally:
+            if archivo:
+                conn.execute("DETACH DATABASE archivo")
+        
+        # Devolver al sistema las páginas liberadas y refrescar estadísticas
+        conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA optimize")
+        
+        return purgados
+    
+    def cargar_indice(self, max_ids=JobMonitorConfig.INDICE_MAX_IDS):
+        """Precarga en memoria todos los ids conocidos"""
+        self.indice = IndiceOfertasVistas(max_ids)
+        # La PK ya es la huella: no hace falta leer ni hashear los ids
+        cursor = self.conectar().execute("SELECT clave FROM ofertas")
+        for (clave,) in cursor:
+            self.indice.agregar_huella(clave)
+            if not self.indice.completo:
+                break
+        return self.indice
+    
+    def _marcar_guardadas(self, ids):
+        """Añade los ids al índice; dentro de transaccion(), cuando se confirme"""
+        if self.indice is None:
+            return
+        if self._en_transaccion:
+            self._sin_confirmar.update(ids)
+            return
+        for oferta_id in ids:
+            self.indice.agregar(oferta_id)
     
     def oferta_existe(self, oferta_id):
         """Verifica si la oferta ya está en la BD"""
-        conn = sqlite3.connect(self.db_name)
+        if oferta_id in self._sin_confirmar:
+            return True
+        if self.indice is not None:
+            conocidos, pendientes = self.indice.resolver([oferta_id])
+            if not pendientes:
+                return bool(conocidos)
+        
+        conn = self.conectar()
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM ofertas WHERE id = ?", (oferta_id,))
+        cursor.execute("SELECT id FROM ofertas WHERE clave = ?", (huella_oferta(oferta_id),))
         resultado = cursor.fetchone()
-        conn.close()
         return resultado is not None
     
-    def guardar_oferta(self, oferta):
-        """Guarda una nueva oferta en la BD"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO ofertas (id, titulo, empresa, url, salario, portal, 
-                                fecha_publicacion, fecha_encontrada)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    SQL_INSERTAR_OFERTA = """
+        INSERT INTO ofertas (clave, id, titulo, empresa, url, salario, portal, 
+                            fecha_publicacion, fecha_encontrada, descripcion, remoto,
+                            clave_verificada)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    """
+    
+    @staticmethod
+    def _fila_oferta(oferta, fecha_encontrada):
+        """Convierte el dict de una oferta en la tupla del INSERT"""
+        return (
+            huella_oferta(oferta["id"]),
             oferta["id"],
             oferta["titulo"],
             oferta["empresa"],
@@ -108,36 +898,168 @@ class DatabaseManager:
             oferta["salario"],
             oferta["portal"],
             oferta["fecha_publicacion"],
-            datetime.now()
-        ))
+            fecha_encontrada,
+            oferta.get("descripcion"),
+            oferta.get("remoto")
+        )
+    
+    def guardar_oferta(self, oferta):
+        """Guarda una nueva oferta en la BD"""
+        conn = self.conectar()
+        cursor = conn.cursor()
+        ahora = datetime.now()
+        cursor.execute(self.SQL_INSERTAR_OFERTA, self._fila_oferta(oferta, ahora))
+        self._acumular_estadisticas(conn, [(ahora, oferta["portal"], oferta["salario"])])
+        self._confirmar()
+        self._marcar_guardadas([oferta["id"]])
+    
+    def ids_existentes(self, ids):
+        """Devuelve cuáles de los ids ya están en la BD (IN por bloques)"""
+        conn = self._conexion_lectura()
+        # Guardados en la transacción abierta: aún no están en el índice
+        existentes = {oferta_id for oferta_id in ids if oferta_id in self._sin_confirmar}
+        ids = [oferta_id for oferta_id in ids if oferta_id not in existentes]
         
-        conn.commit()
-        conn.close()
+        # Con el índice cargado solo llegan a la BD los ids dudosos
+        if self.indice is not None:
+            conocidos, ids = self.indice.resolver(ids)
+            existentes |= conocidos
+        
+        # Se consulta por huella (PK entera) y se traduce de vuelta al id
+        por_huella = {huella_oferta(oferta_id): oferta_id for oferta_id in ids}
+        huellas = list(por_huella)
+        
+        # Bloques por debajo del límite de parámetros de SQLite
+        tamano = JobMonitorConfig.DB_LOTE_IN
+        for inicio in range(0, len(huellas), tamano):
+            bloque = huellas[inicio:inicio + tamano]
+            marcadores = ",".join("?" * len(bloque))
+            cursor = conn.execute(
+                f"SELECT clave FROM ofertas WHERE clave IN ({marcadores})",
+                bloque
+            )
+            existentes.update(por_huella[fila[0]] for fila in cursor)
+        
+        return existentes
+    
+    def registrar_ofertas_nuevas(self, ofertas):
+        """Filtra el lote contra la BD y guarda las nuevas en una transacción"""
+        # Quitar repetidas dentro del propio lote (se queda la primera)
+        unicas = {}
+        for oferta in ofertas:
+            unicas.setdefault(oferta["id"], oferta)
+        
+        with self.transaccion() as conn:
+            existentes = self.ids_existentes(unicas.keys())
+            candidatas = [o for oferta_id, o in unicas.items() if oferta_id not in existentes]
+            
+            nuevas = self._insertar_nuevas(conn, candidatas, datetime.now())
+        
+        self._marcar_guardadas(oferta["id"] for oferta in nuevas)
+        return nuevas
+    
+    def detalles_guardados(self, urls):
+        """Detalles ya parseados de las URLs que los tengan: url -> detalle"""
+        conn = self._conexion_lectura()
+        urls = list(urls)
+        detalles = {}
+        
+        tamano = JobMonitorConfig.DB_LOTE_IN
+        for inicio in range(0, len(urls), tamano):
+            bloque = urls[inicio:inicio + tamano]
+            marcadores = ",".join("?" * len(bloque))
+            cursor = conn.execute(
+                f"SELECT url, salario, descripcion, remoto FROM detalles WHERE url IN ({marcadores})",
+                bloque
+            )
+            for url, salario, descripcion, remoto in cursor:
+                detalles[url] = {
+                    "salario": salario,
+                    "descripcion": descripcion,
+                    "remoto": None if remoto is None else bool(remoto)
+                }
+        
+        return detalles
+    
+    def guardar_detalles(self, detalles):
+        """Guarda (o refresca) los detalles parseados: url -> detalle"""
+        ahora = datetime.now()
+        with self.transaccion() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO detalles (url, salario, descripcion, remoto, fecha)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (url, d["salario"], d["descripcion"], d["remoto"], ahora)
+                for url, d in detalles.items()
+            ])
     
     def agregar_log(self, portal, accion, detalles=""):
         """Registra actividad en logs"""
-        conn = sqlite3.connect(self.db_name)
+        if self.escritor_logs is not None:
+            self.escritor_logs.agregar(portal, accion, detalles)
+            return
+        
+        conn = self.conectar()
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO logs (fecha, portal, accion, detalles)
             VALUES (?, ?, ?, ?)
         """, (datetime.now(), portal, accion, detalles))
-        conn.commit()
-        conn.close()
+        self._confirmar()
     
-    def obtener_ofertas_del_dia(self):
-        """Obtiene ofertas encontradas hoy"""
-        conn = sqlite3.connect(self.db_name)
+    def estadisticas_diarias(self, desde, hasta):
+        """Contadores de los días [desde, hasta) por día y portal"""
+        conn = self.conectar()
+        cursor = conn.execute("""
+            SELECT dia, portal, ofertas, con_salario, salario_suma, salario_min, salario_max
+            FROM estadisticas_diarias
+            WHERE dia >= ? AND dia < ?
+            ORDER BY dia, portal
+        """, (desde.isoformat(), hasta.isoformat()))
+        
+        return [
+            {
+                "dia": dia,
+                "portal": portal,
+                "ofertas": ofertas,
+                "con_salario": con_salario,
+                "salario_medio": suma / con_salario if con_salario else None,
+                "salario_min": minimo,
+                "salario_max": maximo
+            }
+            for dia, portal, ofertas, con_salario, suma, minimo, maximo in cursor
+        ]
+    
+    def estadisticas_del_dia(self, dia=None):
+        """Contadores de un día (hoy por defecto) por portal"""
+        dia = dia or datetime.now().date()
+        return self.estadisticas_diarias(dia, dia + timedelta(days=1))
+    
+    def obtener_ofertas_entre(self, desde, hasta):
+        """Obtiene ofertas encontradas en el rango [desde, hasta)"""
+        conn = self.conectar()
         cursor = conn.cursor()
-        hoy = datetime.now().date()
+        # Rango semiabierto sobre la columna sin funciones: usa el índice
         cursor.execute("""
             SELECT titulo, empresa, url, salario, portal 
             FROM ofertas 
-            WHERE DATE(fecha_encontrada) = ?
-        """, (hoy,))
+            WHERE fecha_encontrada >= ? AND fecha_encontrada < ?
+            ORDER BY fecha_encontrada
+        """, (desde, hasta))
         ofertas = cursor.fetchall()
-        conn.close()
         return ofertas
+    
+    def obtener_ofertas_del_dia(self, dia=None):
+        """Obtiene ofertas encontradas hoy (o el día indicado)"""
+        dia = dia or datetime.now().date()
+        desde = datetime.combine(dia, datetime.min.time())
+        return self.obtener_ofertas_entre(desde, desde + timedelta(days=1))
+    
+    def obtener_ofertas_de_la_semana(self, dia=None):
+        """Obtiene ofertas de la semana (lunes a domingo) que contiene el día"""
+        dia = dia or datetime.now().date()
+        lunes = datetime.combine(dia - timedelta(days=dia.weekday()), datetime.min.time())
+        return self.obtener_ofertas_entre(lunes, lunes + timedelta(days=7))
 
 
 # ============================================================================
@@ -159,7 +1081,11 @@ class FileManager:
                 f.write(f"🏢 Empresa: {oferta['empresa']}\n")
                 f.write(f"💼 Portal: {oferta['portal'].upper()}\n")
                 f.write(f"💰 Salario: {oferta['salario']}\n")
+                if oferta.get("remoto") is not None:
+                    f.write(f"🏠 Remoto: {'Sí' if oferta['remoto'] else 'No'}\n")
                 f.write(f"🔗 URL: {oferta['url']}\n")
+                if oferta.get("descripcion"):
+                    f.write(f"📝 Descripción: {oferta['descripcion'][:500]}\n")
                 f.write(f"⏰ Encontrada: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
                 f.write(f"{'='*70}\n\n")
             
@@ -171,7 +1097,7 @@ class FileManager:
             return False
     
     @staticmethod
-    def guardar_resumen_txt(ofertas_nuevas):
+    def guardar_resumen_txt(ofertas_nuevas, estadisticas=()):
         """Guarda resumen diario en TXT"""
         try:
             with open(JobMonitorConfig.RESUMEN_FILE, "a", encoding="utf-8") as f:
@@ -184,6 +1110,11 @@ class FileManager:
                 else:
                     f.write(f"✅ Se encontraron {len(ofertas_nuevas)} ofertas nuevas:\n\n")
                     
+                    for estadistica in estadisticas:
+                        f.write(f"   {resumen_estadistica(estadistica)}\n")
+                    if estadisticas:
+                        f.write("\n")
+                    
                     for i, oferta in enumerate(ofertas_nuevas, 1):
                         f.write(f"{i}. {oferta['titulo']}\n")
                         f.write(f"   🏢 {oferta['empresa']}\n")
@@ -215,231 +1146,1631 @@ class FileManager:
 
 
 # ============================================================================
-# SCRAPING DE PORTALES
+# CLIENTE HTTP
 # ============================================================================
 
-class PortalScraper:
-    """Extrae ofertas de diferentes portales"""
+class AdaptadorHTTP(HTTPAdapter):
+    """HTTPAdapter con timeout por defecto para las peticiones que no lo indican"""
     
-    def __init__(self, titulo_busqueda=None):
-        self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        self.db = DatabaseManager()
-        self.titulo_busqueda = titulo_busqueda or JobMonitorConfig.CRITERIOS["titulo_busqueda"]
+    def __init__(self, timeout=JobMonitorConfig.HTTP_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
     
-    def buscar_en_indeed(self):
-        """Busca ofertas en Indeed"""
-        print(f"🔍 Buscando en Indeed: '{self.titulo_busqueda}'...")
-        ofertas = []
-        
-        try:
-            url = "https://es.indeed.com/jobs"
-            parametros = {
-                "q": self.titulo_busqueda,
-                "l": "Spain",
-                "radius": "0",
-                "jt": "fulltime"
-            }
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def crear_sesion_http(cabeceras=None, timeout=JobMonitorConfig.HTTP_TIMEOUT):
+    """Session con keep-alive y un pool de conexiones por host"""
+    sesion = requests.Session()
+    sesion.headers.update(cabeceras or JobMonitorConfig.HTTP_CABECERAS)
+    # gzip/deflate siempre; br y zstd solo si urllib3 puede descomprimirlos
+    # (pip install brotli zstandard): nunca se pide lo que no se sabe leer
+    sesion.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    
+    # Pool general para cualquier host...
+    adaptador = AdaptadorHTTP(
+        timeout,
+        pool_connections=JobMonitorConfig.HTTP_POOL_HOSTS,
+        pool_maxsize=JobMonitorConfig.HTTP_POOL_CONEXIONES
+    )
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    
+    # ...y uno a medida por portal (gana el prefijo montado más largo)
+    for prefijo, conexiones in JobMonitorConfig.HTTP_POOL_POR_HOST.items():
+        sesion.mount(prefijo, AdaptadorHTTP(timeout, pool_connections=1, pool_maxsize=conexiones))
+    
+    return sesion
+
+
+class MetricasHTTP:
+    """Bytes por la red frente a bytes ya descomprimidos de las páginas de una ronda"""
+    
+    def __init__(self):
+        self.bloqueo = threading.Lock()  # Se actualiza desde varios hilos
+        self.reiniciar()
+    
+    def reiniciar(self):
+        self.paginas = 0
+        self.bytes_red = 0
+        self.bytes_cuerpo = 0
+    
+    def registrar(self, bytes_red, bytes_cuerpo):
+        with self.bloqueo:
+            self.paginas += 1
+            self.bytes_red += bytes_red
+            self.bytes_cuerpo += bytes_cuerpo
+    
+    def resumen(self):
+        """Una línea con lo descargado y lo ahorrado por la compresión"""
+        kb = lambda valor: f"{valor / 1024:,.1f} KB"
+        ahorro = 1 - self.bytes_red / self.bytes_cuerpo if self.bytes_cuerpo else 0
+        return (f"📦 HTTP: {self.paginas} páginas, {kb(self.bytes_red)} por la red para "
+                f"{kb(self.bytes_cuerpo)} descomprimidos ({ahorro:.1%} ahorrado)")
+
+
+def bytes_en_red(cabeceras, bytes_cuerpo):
+    """Tamaño con el que llegó un cuerpo: Content-Length si venía comprimido"""
+    if cabeceras.get("Content-Encoding") and cabeceras.get("Content-Length"):
+        return int(cabeceras["Content-Length"])
+    return bytes_cuerpo
+
+
+class CircuitoAbierto(Exception):
+    """El host ha fallado demasiadas veces seguidas y está en enfriamiento"""
+    
+    def __init__(self, host, segundos):
+        self.host = host
+        self.segundos = segundos
+        super().__init__(f"{host} aparcado {segundos / 60:.0f} min más tras fallos seguidos")
+
+
+def segundos_retry_after(valor):
+    """Segundos que pide esperar una cabecera Retry-After (número o fecha HTTP)"""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, fecha.timestamp() - time.time())
+
+
+class LimitadorHosts:
+    """Token bucket por host, pausas ante 429/503 y circuito que aparca hosts caídos
+    
+    Lo comparten todos los scrapers (hilos y asyncio): reservar() dice cuánto
+    esperar antes de cada petición y registrar() si hay que reintentarla.
+    """
+    
+    REINTENTABLES = (429, 503)
+    FALLOS = (403, 429, 503)
+    
+    def __init__(self, peticiones_por_segundo=JobMonitorConfig.HTTP_PETICIONES_POR_SEGUNDO,
+                 rafaga=JobMonitorConfig.HTTP_RAFAGA,
+                 reintentos=JobMonitorConfig.HTTP_REINTENTOS,
+                 espera_base=JobMonitorConfig.HTTP_ESPERA_BASE,
+                 espera_max=JobMonitorConfig.HTTP_ESPERA_MAX,
+                 umbral_fallos=JobMonitorConfig.HTTP_CIRCUITO_FALLOS,
+                 enfriamiento=JobMonitorConfig.HTTP_CIRCUITO_ENFRIAMIENTO):
+        self.tasa = peticiones_por_segundo
+        self.rafaga = rafaga
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento = enfriamiento
+        self.bloqueo = threading.Lock()
+        self.hosts = {}
+    
+    def _estado(self, host):
+        return self.hosts.setdefault(host, {
+            "tokens": float(self.rafaga),
+            "recarga": time.monotonic(),
+            "pausa_hasta": 0.0,
+            "fallos": 0,
+            "abierto_hasta": 0.0
+        })
+    
+    def reservar(self, host):
+        """Toma un turno para el host y devuelve los segundos a esperar"""
+        with self.bloqueo:
+            estado = self._estado(host)
+            ahora = time.monotonic()
+            if estado["abierto_hasta"] > ahora:
+                raise CircuitoAbierto(host, estado["abierto_hasta"] - ahora)
             
-            response = requests.get(
-                url,
-                params=parametros,
-                headers=self.headers,
-                timeout=10
+            # Tokens negativos = peticiones en cola: cada una espera su turno
+            estado["tokens"] = min(
+                self.rafaga,
+                estado["tokens"] + (ahora - estado["recarga"]) * self.tasa
             )
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
-                jobs = soup.find_all("div", class_="job_seen_beacon")
-                
-                for job in jobs[:10]:  # Primeras 10
-                    try:
-                        titulo = job.find("h2", class_="jobTitle")
-                        if not titulo:
-                            continue
-                        titulo = titulo.text.strip()
-                        
-                        empresa = job.find("span", class_="companyName")
-                        empresa = empresa.text.strip() if empresa else "Desconocida"
-                        
-                        url_job = job.find("a", class_="jcs-JobTitle")
-                        url_job = url_job.get("href", "") if url_job else ""
-                        
-                        salario_elem = job.find("span", class_="salary-snippet")
-                        salario = salario_elem.text.strip() if salario_elem else "No especificado"
-                        
-                        oferta_id = f"indeed_{titulo}_{empresa}".replace(" ", "_")
-                        
-                        oferta = {
-                            "id": oferta_id,
-                            "titulo": titulo,
-                            "empresa": empresa,
-                            "url": f"https://es.indeed.com{url_job}" if url_job else "N/A",
-                            "salario": salario,
-                            "portal": "indeed",
-                            "fecha_publicacion": datetime.now()
-                        }
-                        
-                        ofertas.append(oferta)
-                    
-                    except Exception as e:
-                        print(f"⚠️ Error extrayendo oferta: {e}")
-                
-                self.db.agregar_log(
-                    "indeed",
-                    "busqueda",
-                    f"Se encontraron {len(ofertas)} ofertas"
-                )
-                print(f"   ✅ {len(ofertas)} ofertas en Indeed")
-        
-        except Exception as e:
-            print(f"❌ Error en Indeed: {e}")
-            self.db.agregar_log("indeed", "error", str(e))
-        
-        return ofertas
+            estado["recarga"] = ahora
+            estado["tokens"] -= 1
+            espera = -estado["tokens"] / self.tasa if estado["tokens"] < 0 else 0.0
+            return max(espera, estado["pausa_hasta"] - ahora)
     
-    def buscar_en_infojobs(self):
-        """Busca ofertas en InfoJobs"""
-        print(f"🔍 Buscando en InfoJobs: '{self.titulo_busqueda}'...")
-        ofertas = []
+    def registrar(self, host, codigo, retry_after=None, intento=0):
+        """Anota el resultado (codigo None = error de red); True si hay que reintentar
         
-        try:
-            url = "https://www.infojobs.net/search"
-            parametros = {
-                "q": self.titulo_busqueda,
-                "c": "47"  # Código de España
-            }
-            
-            response = requests.get(
-                url,
-                params=parametros,
-                headers=self.headers,
-                timeout=10
-            )
+        El circuito cuenta peticiones fallidas, no intentos: un 429/503 que se
+        va a reintentar solo pausa el host.
+        """
+        with self.bloqueo:
+            estado = self._estado(host)
+            if codigo is not None and codigo not in self.FALLOS:
+                estado["fallos"] = 0
+                return False
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
-                jobs = soup.find_all("article", class_="offer")
+            ahora = time.monotonic()
+            if codigo in self.REINTENTABLES:
+                # Backoff exponencial con jitter, o lo que pida el portal si es más
+                espera = min(self.espera_max, self.espera_base * 2 ** intento)
+                espera += random.uniform(0, self.espera_base)
+                pedida = segundos_retry_after(retry_after)
+                if pedida is not None:
+                    espera = max(espera, pedida)
+                estado["pausa_hasta"] = max(estado["pausa_hasta"], ahora + espera)
                 
-                for job in jobs[:10]:
-                    try:
-                        titulo_elem = job.find("h2")
-                        if not titulo_elem:
-                            continue
-                        titulo = titulo_elem.text.strip()
-                        
-                        empresa_elem = job.find("span", class_="company")
-                        empresa = empresa_elem.text.strip() if empresa_elem else "Desconocida"
-                        
-                        url_elem = job.find("a", class_="link")
-                        url_job = url_elem.get("href", "") if url_elem else ""
-                        
-                        oferta_id = f"infojobs_{titulo}_{empresa}".replace(" ", "_")
-                        
-                        oferta = {
-                            "id": oferta_id,
-                            "titulo": titulo,
-                            "empresa": empresa,
-                            "url": f"https://infojobs.net{url_job}" if url_job else "N/A",
-                            "salario": "No especificado",
-                            "portal": "infojobs",
-                            "fecha_publicacion": datetime.now()
-                        }
-                        
-                        ofertas.append(oferta)
-                    
-                    except Exception as e:
-                        print(f"⚠️ Error extrayendo oferta: {e}")
-                
-                self.db.agregar_log(
-                    "infojobs",
-                    "busqueda",
-                    f"Se encontraron {len(ofertas)} ofertas"
-                )
-                print(f"   ✅ {len(ofertas)} ofertas en InfoJobs")
-        
-        except Exception as e:
-            print(f"❌ Error en InfoJobs: {e}")
-            self.db.agregar_log("infojobs", "error", str(e))
+                if intento < self.reintentos and espera <= self.espera_max:
+                    return True
+            
+            estado["fallos"] += 1
+            if estado["fallos"] >= self.umbral_fallos:
+                # Al acabar el enfriamiento basta un fallo más para volver a aparcarlo
+                estado["abierto_hasta"] = ahora + self.enfriamiento
+                estado["fallos"] = self.umbral_fallos - 1
+            return False
+
+
+# Un solo limitador por proceso: el ritmo es por host, no por scraper
+LIMITADOR_HTTP = LimitadorHosts()
+
+
+class CacheHTTP:
+    """Validadores (ETag/Last-Modified) y ofertas ya parseadas de cada búsqueda
+    
+    Un fichero JSON por URL+parámetros. Si el portal responde 304 se reutilizan
+    las ofertas guardadas y la página no se descarga ni se parsea.
+    """
+    
+    def __init__(self, directorio=JobMonitorConfig.HTTP_CACHE_DIR,
+                 max_bytes=JobMonitorConfig.HTTP_CACHE_MAX_BYTES):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.bloqueo = threading.Lock()  # La usan varios hilos a la vez
+        self.aciertos = 0
+        os.makedirs(directorio, exist_ok=True)
         
-        return ofertas
+        # Orden LRU (menos reciente primero) a partir de la fecha de último uso
+        entradas = []
+        for nombre in os.listdir(directorio):
+            if nombre.endswith(".json"):
+                info = os.stat(os.path.join(directorio, nombre))
+                entradas.append((info.st_mtime, nombre[:-5], info.st_size))
+        self.tamanos = OrderedDict((clave, tamano) for _, clave, tamano in sorted(entradas))
+        self.total = sum(self.tamanos.values())
     
-    def buscar_en_computrabajo(self):
-        """Busca ofertas en Computrabajo"""
-        print(f"🔍 Buscando en Computrabajo: '{self.titulo_busqueda}'...")
-        ofertas = []
+    @staticmethod
+    def clave(url, params=None):
+        """Nombre de la entrada: hash de la URL y los parámetros ordenados"""
+        texto = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32]
+    
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + ".json")
+    
+    def obtener(self, url, params=None):
+        """Entrada guardada para la búsqueda (None si no hay)"""
+        clave = self.clave(url, params)
+        try:
+            with open(self._ruta(clave), encoding="utf-8") as f:
+                entrada = json.load(f)
+            os.utime(self._ruta(clave))  # Último uso, para el LRU entre ejecuciones
+        except (OSError, ValueError):
+            return None
+        
+        with self.bloqueo:
+            if clave in self.tamanos:
+                self.tamanos.move_to_end(clave)
+        return entrada
+    
+    @staticmethod
+    def cabeceras_condicionales(entrada):
+        """If-None-Match / If-Modified-Since a partir de una entrada"""
+        cabeceras = {}
+        if entrada and entrada.get("etag"):
+            cabeceras["If-None-Match"] = entrada["etag"]
+        if entrada and entrada.get("last_modified"):
+            cabeceras["If-Modified-Since"] = entrada["last_modified"]
+        return cabeceras
+    
+    def ofertas(self, entrada):
+        """Ofertas de una respuesta 304 (como si se acabaran de parsear)"""
+        self.aciertos += 1
+        ahora = datetime.now()
+        return [dict(oferta, fecha_publicacion=ahora) for oferta in entrada["ofertas"]]
+    
+    def guardar(self, url, params, cabeceras, ofertas):
+        """Guarda validadores y ofertas si la respuesta trae alguno"""
+        etag = cabeceras.get("ETag")
+        last_modified = cabeceras.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        
+        clave = self.clave(url, params)
+        datos = json.dumps({
+            "url": url,
+            "params": params,
+            "etag": etag,
+            "last_modified": last_modified,
+            "ofertas": ofertas
+        }, ensure_ascii=False, default=str).encode("utf-8")
+        
+        # Escritura atómica: un lector nunca ve el fichero a medias
+        temporal = self._ruta(clave) + f".{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(datos)
+        os.replace(temporal, self._ruta(clave))
+        
+        with self.bloqueo:
+            self.total += len(datos) - self.tamanos.pop(clave, 0)
+            self.tamanos[clave] = len(datos)
+            self._desalojar()
+    
+    def _desalojar(self):
+        """Borra las entradas menos usadas hasta caber en max_bytes"""
+        while self.total > self.max_bytes and len(self.tamanos) > 1:
+            clave, tamano = self.tamanos.popitem(last=False)
+            self.total -= tamano
+            try:
+                os.remove(self._ruta(clave))
+            except OSError:
+                pass
+
+
+class PeticionesEnCurso:
+    """Single-flight: llamadas iguales simultáneas comparten una sola petición
+    
+    La primera llamada con una clave hace el trabajo; las que llegan mientras
+    tanto esperan su resultado (o su excepción) en vez de repetirlo. El
+    resultado se sigue sirviendo `ttl` segundos; los errores no se guardan.
+    """
+    
+    def __init__(self, ttl=JobMonitorConfig.HTTP_COMPARTIR_TTL):
+        self.ttl = ttl
+        self.bloqueo = threading.Lock()
+        self.en_curso = {}  # clave -> Future (hilos)
+        self.en_curso_async = {}  # clave -> asyncio.Future (solo desde el loop)
+        self.recientes = OrderedDict()  # clave -> (caduca, resultado), por caducidad
+        self.compartidas = 0
+    
+    def _reciente(self, clave):
+        """(True, resultado) si hay uno vigente; purga los caducados"""
+        ahora = time.monotonic()
+        while self.recientes and next(iter(self.recientes.values()))[0] <= ahora:
+            self.recientes.popitem(last=False)
+        if clave in self.recientes:
+            self.compartidas += 1
+            return True, self.recientes[clave][1]
+        return False, None
+    
+    def _terminar(self, clave, en_curso, resultado, correcto):
+        with self.bloqueo:
+            del en_curso[clave]
+            if correcto and self.ttl:
+                self.recientes[clave] = (time.monotonic() + self.ttl, resultado)
+    
+    def ejecutar(self, clave, funcion, *args):
+        """funcion(*args), o el resultado de la llamada igual que ya esté en curso"""
+        with self.bloqueo:
+            hay, resultado = self._reciente(clave)
+            if hay:
+                return resultado
+            futuro = self.en_curso.get(clave)
+            esperar = futuro is not None
+            if esperar:
+                self.compartidas += 1
+            else:
+                futuro = self.en_curso[clave] = Future()
+        
+        if esperar:
+            return futuro.result()
         
         try:
-            url = "https://www.computrabajo.com/search/jobs"
-            parametros = {
-                "q": self.titulo_busqueda,
-                "location": "Spain"
+            resultado = funcion(*args)
+        except BaseException as e:
+            self._terminar(clave, self.en_curso, None, False)
+            futuro.set_exception(e)
+            raise
+        self._terminar(clave, self.en_curso, resultado, True)
+        futuro.set_result(resultado)
+        return resultado
+    
+    async def ejecutar_async(self, clave, crear_corrutina):
+        """Versión asyncio de ejecutar: crear_corrutina() solo se llama si hace falta"""
+        while True:
+            with self.bloqueo:
+                hay, resultado = self._reciente(clave)
+            if hay:
+                return resultado
+            
+            futuro = self.en_curso_async.get(clave)
+            if futuro is None:
+                break
+            self.compartidas += 1
+            try:
+                # shield: si cancelan a quien espera, la petición sigue para los demás
+                return await asyncio.shield(futuro)
+            except asyncio.CancelledError:
+                if not futuro.cancelled():
+                    raise
+                # Cancelaron a quien la hacía (plazo de su búsqueda): se reintenta
+        
+        futuro = self.en_curso_async[clave] = asyncio.get_running_loop().create_future()
+        try:
+            resultado = await crear_corrutina()
+        except asyncio.CancelledError:
+            self._terminar(clave, self.en_curso_async, None, False)
+            futuro.cancel()
+            raise
+        except Exception as e:
+            self._terminar(clave, self.en_curso_async, None, False)
+            futuro.set_exception(e)
+            futuro.exception()  # Marcada como leída aunque nadie más esperase
+            raise
+        self._terminar(clave, self.en_curso_async, resultado, True)
+        futuro.set_result(resultado)
+        return resultado
+
+
+# Páginas de resultados de ejemplo, con tarjetas de oferta (benchmarks y casetes)
+DIRECTORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class Casete:
+    """Respuestas HTTP grabadas (JSON con gzip) para reproducir el monitor sin red"""
+    
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.respuestas = {}
+        self.bloqueo = threading.Lock()
+        self.reproducidas = 0
+        self.sin_grabar = 0
+        if os.path.exists(ruta):
+            with gzip.open(ruta, "rt", encoding="utf-8") as f:
+                self.respuestas = json.load(f)
+    
+    @staticmethod
+    def clave(metodo, url):
+        """Método + URL con los parámetros ordenados"""
+        partes = urlparse(url)
+        query = "&".join(sorted(partes.query.split("&"))) if partes.query else ""
+        return f"{metodo} {partes.scheme}://{partes.netloc}{partes.path}?{query}"
+    
+    def agregar(self, url, cuerpo, estado=200, cabeceras=None, metodo="GET"):
+        """Añade (o sustituye) la respuesta de una URL"""
+        with self.bloqueo:
+            self.respuestas[self.clave(metodo, url)] = {
+                "estado": estado,
+                "cabeceras": dict(cabeceras or {}),
+                "cuerpo": base64.b64encode(cuerpo).decode("ascii")
             }
+    
+    def grabar(self, response, *args, **kwargs):
+        """Hook de requests: guarda cada respuesta real que llega"""
+        # El cuerpo se guarda ya descomprimido: esas cabeceras dejarían de ser ciertas
+        cabeceras = {
+            nombre: valor for nombre, valor in response.headers.items()
+            if nombre.lower() not in ("content-encoding", "transfer-encoding", "content-length")
+        }
+        self.agregar(response.request.url, response.content, response.status_code,
+                     cabeceras, response.request.method)
+    
+    def buscar(self, metodo, url):
+        """Respuesta grabada para la petición (None si no está)"""
+        grabada = self.respuestas.get(self.clave(metodo, url))
+        with self.bloqueo:
+            if grabada is None:
+                self.sin_grabar += 1
+            else:
+                self.reproducidas += 1
+        return grabada
+    
+    def guardar(self):
+        """Escribe el casete (atómico: primero a un temporal)"""
+        with self.bloqueo:
+            datos = json.dumps(self.respuestas, ensure_ascii=False)
+        temporal = self.ruta + ".tmp"
+        with gzip.open(temporal, "wt", encoding="utf-8") as f:
+            f.write(datos)
+        os.replace(temporal, self.ruta)
+    
+    @staticmethod
+    def _pagina_con_ofertas(portal, directorio):
+        """debug_<portal>.html, o la de fixtures/ si aquella no trae ninguna oferta"""
+        rutas = [
+            os.path.join(directorio, f"debug_{portal}.html"),
+            os.path.join(DIRECTORIO_FIXTURES, f"resultados_{portal}.html")
+        ]
+        for ruta in rutas:
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            if PARSERS[portal](contenido):
+                return contenido
+            print(f"⚠️  {ruta} no tiene ofertas de {portal}")
+        return None
+    
+    @classmethod
+    def desde_html_debug(cls, ruta, titulo=None, directorio="."):
+        """Casete con los debug_<portal>.html como primera página de cada búsqueda
+        
+        Si un debug_<portal>.html no tiene ofertas (captcha, página cortada...)
+        se usa la página de ejemplo de fixtures/.
+        """
+        casete = cls(ruta)
+        titulo = titulo or JobMonitorConfig.CRITERIOS["titulo_busqueda"]
+        for portal, config in JobMonitorConfig.PORTALES.items():
+            if portal not in PARSERS:
+                continue
+            contenido = cls._pagina_con_ofertas(portal, directorio)
+            if contenido is None:
+                continue
+            url = requests.Request(
+                "GET", config["url"], params=PortalScraper.parametros(portal, titulo)
+            ).prepare().url
+            casete.agregar(url, contenido, cabeceras={"Content-Type": "text/html; charset=utf-8"})
+        return casete
+
+
+class AdaptadorCasete(BaseAdapter):
+    """Adaptador de requests que responde desde un casete, sin tocar la red"""
+    
+    def __init__(self, casete, latencia=JobMonitorConfig.HTTP_CASETE_LATENCIA):
+        super().__init__()
+        self.casete = casete
+        self.latencia = latencia
+    
+    def send(self, request, **kwargs):
+        if self.latencia:
+            time.sleep(self.latencia)  # Simula el tiempo de respuesta del portal
+        
+        grabada = self.casete.buscar(request.method, request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if grabada is None:
+            response.status_code = 404
+            response.reason = "No grabada en el casete"
+            response._content = b""
+        else:
+            response.status_code = grabada["estado"]
+            response.headers = CaseInsensitiveDict(grabada["cabeceras"])
+            response._content = base64.b64decode(grabada["cuerpo"])
+        # El cuerpo ya está en memoria: iter_content (stream=True) lo trocea
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+    
+    def close(self):
+        pass
+
+
+# ============================================================================
+# SCRAPING DE PORTALES
+# ============================================================================
+
+def solo_clase(etiqueta, clase):
+    """SoupStrainer de las `etiqueta` que tengan `clase` (entre otras)"""
+    # Al filtrar, el atributo class aún es el texto completo ("a b c")
+    return SoupStrainer(
+        etiqueta,
+        class_=lambda valor: valor is not None and clase in valor.split()
+    )
+
+
+class TarjetaSoup:
+    """Tarjeta de oferta del árbol de BeautifulSoup (backend "html.parser")"""
+    
+    def __init__(self, elemento):
+        self.elemento = elemento
+    
+    def _buscar(self, etiqueta, clase):
+        if clase:
+            return self.elemento.find(etiqueta, class_=clase)
+        return self.elemento.find(etiqueta)
+    
+    @staticmethod
+    def _texto(elemento):
+        return elemento.text
+    
+    @staticmethod
+    def _atributo(elemento, nombre):
+        return elemento.get(nombre, "")
+    
+    def texto(self, etiqueta, clase=None):
+        """Texto del primer `etiqueta` (con `clase`) de la tarjeta; None si no hay"""
+        elemento = self._buscar(etiqueta, clase)
+        return self._texto(elemento).strip() if elemento is not None else None
+    
+    def atributo(self, etiqueta, nombre, clase=None):
+        """Atributo `nombre` del primer `etiqueta` (con `clase`); "" si no hay"""
+        elemento = self._buscar(etiqueta, clase)
+        return self._atributo(elemento, nombre) if elemento is not None else ""
+
+
+class TarjetaLxml(TarjetaSoup):
+    """Tarjeta de oferta de un árbol de lxml.html"""
+    
+    def _buscar(self, etiqueta, clase):
+        encontrados = _xpath_clase("descendant", etiqueta, clase)(self.elemento)
+        return encontrados[0] if encontrados else None
+    
+    @staticmethod
+    def _texto(elemento):
+        return _unir_textos(_textos_lxml(elemento))
+
+
+class TarjetaSelectolax(TarjetaSoup):
+    """Tarjeta de oferta de un árbol de selectolax (lexbor)"""
+    
+    def _buscar(self, etiqueta, clase):
+        return self.elemento.css_first(f"{etiqueta}.{clase}" if clase else etiqueta)
+    
+    @staticmethod
+    def _texto(elemento):
+        return _unir_textos(_textos_selectolax(elemento))
+    
+    @staticmethod
+    def _atributo(elemento, nombre):
+        # <a href> sin valor: None en selectolax, "" en BeautifulSoup
+        return elemento.attributes.get(nombre) or ""
+
+
+_ESPACIOS_ASCII = " \n\t\f\r"
+# Su contenido no cuenta en el .text de BeautifulSoup (no es texto visible)
+_SIN_TEXTO = {"script", "style", "template"}
+
+
+def _textos_lxml(elemento):
+    """Textos de un elemento de lxml en orden, sin comentarios ni scripts"""
+    if elemento.text:
+        yield elemento.text
+    for hijo in elemento:
+        # Comentarios e instrucciones de proceso: su tag no es un str
+        if isinstance(hijo.tag, str) and hijo.tag not in _SIN_TEXTO:
+            yield from _textos_lxml(hijo)
+        # Lo que va después del hijo (su tail) sí es texto del elemento
+        if hijo.tail:
+            yield hijo.tail
+
+
+def _textos_selectolax(nodo):
+    """Textos de un nodo de selectolax en orden, sin comentarios ni scripts"""
+    hijo = nodo.child
+    while hijo is not None:
+        if hijo.tag == "-text":
+            yield hijo.text_content
+        elif not hijo.tag.startswith("-") and hijo.tag not in _SIN_TEXTO:
+            yield from _textos_selectolax(hijo)
+        hijo = hijo.next
+
+
+def _unir_textos(textos):
+    """Une los textos de un elemento igual que el .text de BeautifulSoup
+    
+    BeautifulSoup reduce cada texto que solo tiene espacios a un salto de
+    línea (si lo contiene) o a un espacio: "nuevo\n  \n  Java" -> "nuevo\nJava".
+    """
+    return "".join(
+        ("\n" if "\n" in texto else " ") if not texto.strip(_ESPACIOS_ASCII) else texto
+        for texto in textos if texto
+    )
+
+
+@lru_cache(maxsize=None)
+def _xpath_clase(eje, etiqueta, clase=None):
+    """XPath compilado de las `etiqueta` con `clase` (entre otras) en `eje`"""
+    from lxml import etree
+    
+    condicion = f"[contains(concat(' ', normalize-space(@class), ' '), ' {clase} ')]" if clase else ""
+    # El primero basta dentro de una tarjeta; en la página se quieren todas
+    posicion = "[1]" if eje == "descendant" else ""
+    return etree.XPath(f"{eje}::{etiqueta}{condicion}{posicion}")
+
+
+_BACKEND_HTML = {}
+
+
+def backend_html():
+    """Backend de HTML_PARSER que se puede usar; "html.parser" si falta su paquete"""
+    configurado = JobMonitorConfig.HTML_PARSER
+    if configurado not in _BACKEND_HTML:
+        try:
+            if configurado == "lxml":
+                import lxml.html
+            elif configurado == "selectolax":
+                import selectolax.lexbor
+            _BACKEND_HTML[configurado] = configurado
+        except ImportError:
+            print(f"⚠️  HTML_PARSER = '{configurado}' necesita pip install {configurado}: "
+                  f"se usa html.parser")
+            _BACKEND_HTML[configurado] = "html.parser"
+    return _BACKEND_HTML[configurado]
+
+
+def _como_texto(contenido):
+    """HTML como str, decodificado igual que lo haría BeautifulSoup"""
+    if isinstance(contenido, str):
+        return contenido
+    return UnicodeDammit(contenido, is_html=True).unicode_markup or ""
+
+
+def tarjetas(contenido, etiqueta, clase):
+    """Tarjetas `etiqueta`.`clase` de una página, con el backend de HTML_PARSER"""
+    backend = backend_html()
+    
+    if backend == "lxml":
+        from lxml import etree, html as lxml_html
+        
+        # Página vacía: None (document_fromstring lanzaría ParserError)
+        raiz = etree.fromstring(_como_texto(contenido).encode("utf-8"),
+                                lxml_html.HTMLParser(encoding="utf-8"))
+        if raiz is None:
+            return []
+        return [TarjetaLxml(e) for e in _xpath_clase("descendant-or-self", etiqueta, clase)(raiz)]
+    
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        
+        arbol = LexborHTMLParser(_como_texto(contenido))
+        return [TarjetaSelectolax(nodo) for nodo in arbol.css(f"{etiqueta}.{clase}")]
+    
+    # Solo se construye el árbol de las tarjetas de oferta, no el de toda la página
+    soup = BeautifulSoup(contenido, "html.parser", parse_only=solo_clase(etiqueta, clase))
+    return [TarjetaSoup(e) for e in soup.find_all(etiqueta, class_=clase)]
+
+
+def parsear_indeed(contenido):
+    """Extrae las ofertas de una página de resultados de Indeed"""
+    ofertas = []
+    jobs = tarjetas(contenido, "div", "job_seen_beacon")
+    
+    for job in jobs:
+        try:
+            titulo = job.texto("h2", "jobTitle")
+            if titulo is None:
+                continue
             
-            response = requests.get(
-                url,
-                params=parametros,
-                headers=self.headers,
-                timeout=10
-            )
+            empresa = job.texto("span", "companyName")
+            empresa = empresa if empresa is not None else "Desconocida"
+            
+            url_job = job.atributo("a", "href", "jcs-JobTitle")
+            
+            salario = job.texto("span", "salary-snippet")
+            salario = salario if salario is not None else "No especificado"
+            
+            oferta_id = f"indeed_{titulo}_{empresa}".replace(" ", "_")
+            
+            oferta = {
+                "id": oferta_id,
+                "titulo": titulo,
+                "empresa": empresa,
+                "url": f"https://es.indeed.com{url_job}" if url_job else "N/A",
+                "salario": salario,
+                "portal": "indeed",
+                "fecha_publicacion": datetime.now()
+            }
+            
+            ofertas.append(oferta)
+        
+        except Exception as e:
+            print(f"⚠️ Error extrayendo oferta: {e}")
+    
+    return ofertas
+
+
+def parsear_infojobs(contenido):
+    """Extrae las ofertas de una página de resultados de InfoJobs"""
+    ofertas = []
+    jobs = tarjetas(contenido, "article", "offer")
+    
+    for job in jobs:
+        try:
+            titulo = job.texto("h2")
+            if titulo is None:
+                continue
+            
+            empresa = job.texto("span", "company")
+            empresa = empresa if empresa is not None else "Desconocida"
+            
+            url_job = job.atributo("a", "href", "link")
+            
+            oferta_id = f"infojobs_{titulo}_{empresa}".replace(" ", "_")
+            
+            oferta = {
+                "id": oferta_id,
+                "titulo": titulo,
+                "empresa": empresa,
+                "url": f"https://infojobs.net{url_job}" if url_job else "N/A",
+                "salario": "No especificado",
+                "portal": "infojobs",
+                "fecha_publicacion": datetime.now()
+            }
+            
+            ofertas.append(oferta)
+        
+        except Exception as e:
+            print(f"⚠️ Error extrayendo oferta: {e}")
+    
+    return ofertas
+
+
+def parsear_computrabajo(contenido):
+    """Extrae las ofertas de una página de resultados de Computrabajo"""
+    ofertas = []
+    jobs = tarjetas(contenido, "div", "offer-item")
+    
+    for job in jobs:
+        try:
+            titulo = job.texto("h2")
+            if titulo is None:
+                continue
+            
+            empresa = job.texto("h3")
+            empresa = empresa if empresa is not None else "Desconocida"
+            
+            url_job = job.atributo("a", "href")
+            
+            oferta_id = f"computrabajo_{titulo}_{empresa}".replace(" ", "_")
+            
+            oferta = {
+                "id": oferta_id,
+                "titulo": titulo,
+                "empresa": empresa,
+                "url": url_job if url_job.startswith("http") else f"https://computrabajo.com{url_job}",
+                "salario": "No especificado",
+                "portal": "computrabajo",
+                "fecha_publicacion": datetime.now()
+            }
+            
+            ofertas.append(oferta)
+        
+        except Exception as e:
+            print(f"⚠️ Error extrayendo oferta: {e}")
+    
+    return ofertas
+
+
+PATRON_REMOTO = re.compile(r"\b(remoto|teletrabajo|remote|home office|desde casa)\b", re.IGNORECASE)
+_CIFRA = r"\d+(?:[.,]\d{3})*\s*k?"
+# "30.000 - 40.000 € brutos al año", "2.000€/mes", "45k EUR"...
+PATRON_SALARIO = re.compile(
+    rf"{_CIFRA}(?:\s*(?:€|eur))?(?:\s*(?:-|–|a)\s*{_CIFRA})?\s*(?:€|eur)"
+    r"(?:\s*(?:brutos?|netos?))?(?:\s*(?:/|al|por)\s*(?:año|mes|hora))?",
+    re.IGNORECASE
+)
+
+
+def _texto_selector(soup, selectores):
+    """Texto del primer selector CSS que exista en la página (None si ninguno)"""
+    for selector in selectores:
+        elemento = soup.select_one(selector)
+        if elemento:
+            return " ".join(elemento.get_text(" ").split())
+    return None
+
+
+def parsear_detalle(portal, contenido):
+    """Salario, descripción y remoto de la página de detalle de una oferta
+    
+    Lo que no tenga elemento propio en la página se busca en la descripción.
+    """
+    selectores = JobMonitorConfig.PORTALES[portal]["detalle"]
+    soup = BeautifulSoup(contenido, "html.parser")
+    
+    descripcion = _texto_selector(soup, selectores["descripcion"]) or ""
+    salario = _texto_selector(soup, selectores["salario"])
+    if not salario:
+        encontrado = PATRON_SALARIO.search(descripcion)
+        salario = encontrado.group(0) if encontrado else None
+    
+    ubicacion = _texto_selector(soup, selectores["ubicacion"])
+    if ubicacion and PATRON_REMOTO.search(ubicacion):
+        remoto = True
+    elif descripcion:
+        remoto = bool(PATRON_REMOTO.search(descripcion))
+    else:
+        remoto = None
+    
+    return {
+        "salario": salario,
+        "descripcion": descripcion[:JobMonitorConfig.DETALLE_MAX_DESCRIPCION] or None,
+        "remoto": remoto
+    }
+
+
+CAMPOS_FEED = {  # Elementos de RSS/Atom de los que sale cada dato (el primero que haya)
+    "id": ["guid", "id", "link"],
+    "titulo": ["title"],
+    "empresa": ["author", "creator"],
+    "url": ["link"],
+    "salario": [],
+    "fecha": ["pubDate", "published", "updated", "date"],
+    "descripcion": ["description", "summary", "content"]
+}
+
+
+def _etiqueta(tag):
+    """Nombre de un elemento XML sin el espacio de nombres"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _fecha_feed(texto):
+    """Fecha RFC 822 (RSS) o ISO 8601 (Atom/JSON) en hora local; ahora si no se entiende"""
+    if texto:
+        iso = lambda t: datetime.fromisoformat(t.replace("Z", "+00:00"))
+        for convertir in (parsedate_to_datetime, iso):
+            try:
+                fecha = convertir(texto)
+            except (TypeError, ValueError):
+                continue
+            return fecha.astimezone().replace(tzinfo=None) if fecha.tzinfo else fecha
+    return datetime.now()
+
+
+class LectorFeed:
+    """Parser incremental de un feed RSS/Atom o JSON: se alimenta por bloques
+    
+    Cada oferta sale en cuanto se cierra su elemento, que se libera en el acto:
+    no hace falta tener el feed entero en memoria ni construir un árbol.
+    """
+    
+    def __init__(self, portal):
+        self.portal = portal
+        self.config = JobMonitorConfig.PORTALES[portal]
+        self.campos = self.config.get("campos", CAMPOS_FEED)
+        self.ofertas = []
+        self.es_json = self.config.get("formato") == "json"
+        if self.es_json:
+            self._iniciar_json()
+        else:
+            self.parser = ElementTree.XMLPullParser(events=("end",))
+    
+    def _iniciar_json(self):
+        ruta = self.config.get("elementos", "")
+        try:
+            import ijson
+        except ImportError:
+            # Sin ijson se junta el JSON y se parsea al final (pip install ijson)
+            self.bloques = []
+            self.corrutina = None
+            return
+        self.elementos = ijson.sendable_list()
+        self.corrutina = ijson.items_coro(self.elementos, f"{ruta}.item" if ruta else "item")
+    
+    def alimentar(self, bloque):
+        """Procesa un bloque de bytes del feed"""
+        if not self.es_json:
+            self.parser.feed(bloque)
+            self._leer_xml()
+        elif self.corrutina is None:
+            self.bloques.append(bloque)
+        else:
+            self.corrutina.send(bloque)
+            self._agregar_json(self.elementos)
+            del self.elementos[:]
+    
+    def terminar(self):
+        """Ofertas del feed completo"""
+        if not self.es_json:
+            self.parser.close()
+            self._leer_xml()
+        elif self.corrutina is None:
+            datos = json.loads(b"".join(self.bloques))
+            for clave in filter(None, self.config.get("elementos", "").split(".")):
+                datos = datos[clave]
+            self._agregar_json(datos)
+        else:
+            self.corrutina.close()
+            self._agregar_json(self.elementos)
+        return self.ofertas
+    
+    def _leer_xml(self):
+        for _, elemento in self.parser.read_events():
+            if _etiqueta(elemento.tag) not in ("item", "entry"):
+                continue
+            campos = {}
+            for hijo in elemento:
+                nombre = _etiqueta(hijo.tag)
+                # Atom: <link rel="alternate" href="..."/>
+                if nombre == "link" and hijo.get("href"):
+                    if hijo.get("rel", "alternate") != "alternate":
+                        continue
+                    valor = hijo.get("href")
+                else:
+                    valor = "".join(hijo.itertext()).strip()
+                campos.setdefault(nombre, valor)
+            self._agregar(campos)
+            elemento.clear()
+    
+    def _agregar_json(self, elementos):
+        for elemento in elementos:
+            self._agregar(elemento)
+    
+    def _agregar(self, campos):
+        """Convierte los campos de un elemento del feed en una oferta"""
+        def valor(nombre):
+            for clave in self.campos.get(nombre, ()):
+                if campos.get(clave) not in (None, ""):
+                    return str(campos[clave]).strip()
+            return None
+        
+        titulo = valor("titulo")
+        if not titulo:
+            return
+        empresa = valor("empresa")
+        separador = self.config.get("separador_empresa")
+        if not empresa and separador and separador in titulo:
+            empresa, titulo = (parte.strip() for parte in titulo.split(separador, 1))
+        
+        # La descripción suele venir en HTML escapado
+        descripcion = valor("descripcion")
+        if descripcion:
+            descripcion = " ".join(html.unescape(re.sub(r"<[^>]+>", " ", descripcion)).split())
+        salario = valor("salario")
+        if not salario and descripcion:
+            encontrado = PATRON_SALARIO.search(descripcion)
+            salario = encontrado.group(0) if encontrado else None
+        
+        self.ofertas.append({
+            "id": f"{self.portal}_{valor('id') or valor('url') or titulo}",
+            "titulo": titulo,
+            "empresa": empresa or "Desconocida",
+            "url": valor("url") or "N/A",
+            "salario": salario or "No especificado",
+            "portal": self.portal,
+            "fecha_publicacion": _fecha_feed(valor("fecha")),
+            "descripcion": descripcion[:JobMonitorConfig.DETALLE_MAX_DESCRIPCION] if descripcion else None,
+            "remoto": self.config.get("remoto")
+        })
+
+
+def parsear_feed(portal, contenido):
+    """Ofertas de un feed ya descargado entero"""
+    lector = LectorFeed(portal)
+    lector.alimentar(contenido)
+    return lector.terminar()
+
+
+def _normalizar(texto):
+    return " ".join(texto.lower().split())
+
+
+def planificar_busquedas(perfiles):
+    """(portal, título, ubicación) distintos que piden entre todos los perfiles
+    
+    Perfiles que se solapan comparten búsqueda: cada combinación (y por tanto
+    cada página) se pide una sola vez por ronda. En los portales sin parámetro
+    de ubicación todas las ubicaciones son la misma búsqueda (ubicación None).
+    """
+    busquedas = {}
+    for perfil in perfiles:
+        ubicaciones = perfil.get("ubicaciones") or JobMonitorConfig.UBICACIONES
+        for portal in perfil.get("portales") or JobMonitorConfig.PORTALES:
+            config = JobMonitorConfig.PORTALES[portal]
+            acepta_ubicacion = "ubicacion" in config
+            # Sin parámetro de búsqueda todos los títulos son la misma petición
+            titulos = perfil["titulos"] if config.get("busqueda", "q") else [""]
+            for titulo in titulos:
+                for ubicacion in (ubicaciones if acepta_ubicacion else [None]):
+                    clave = (portal, _normalizar(titulo), ubicacion and _normalizar(ubicacion))
+                    # Se queda la forma en que la escribió el primer perfil
+                    busquedas.setdefault(clave, (portal, titulo.strip(), ubicacion))
+    return list(busquedas.values())
+
+
+def fusionar_ofertas(listas):
+    """Une los resultados de varias búsquedas quitando repetidas (se queda la primera)"""
+    unicas = {}
+    for ofertas in listas:
+        for oferta in ofertas:
+            unicas.setdefault(oferta["id"], oferta)
+    return list(unicas.values())
+
+
+# Funciones de módulo (no métodos) para poder parsear también en otro proceso
+PARSERS = {
+    "indeed": parsear_indeed,
+    "infojobs": parsear_infojobs,
+    "computrabajo": parsear_computrabajo
+}
+
+
+class PortalScraper:
+    """Extrae ofertas de diferentes portales"""
+    
+    def __init__(self, titulo_busqueda=None, db=None, sesion=None, cache=None, limitador=None,
+                 casete=None, grabar=False, latencia=JobMonitorConfig.HTTP_CASETE_LATENCIA,
+                 perfiles=None):
+        self.headers = dict(JobMonitorConfig.HTTP_CABECERAS)
+        # Una sola sesión para todos los portales y todas las rondas: las
+        # conexiones TCP+TLS se reutilizan en lugar de abrirse en cada búsqueda
+        self.sesion = sesion or crear_sesion_http(self.headers)
+        # Con casete se quieren respuestas completas, no 304 de la caché
+        if cache is None and JobMonitorConfig.HTTP_CACHE_DIR and casete is None:
+            cache = CacheHTTP()
+        self.cache = cache
+        self.limitador = limitador or LIMITADOR_HTTP
+        # Reproduciendo un casete cada ronda tiene que volver a pedirlo todo
+        self.en_curso = PeticionesEnCurso(JobMonitorConfig.HTTP_COMPARTIR_TTL if casete is None else 0)
+        self.metricas = MetricasHTTP()
+        self.casete = casete
+        self.grabando = casete is not None and grabar
+        if casete is not None:
+            self._usar_casete(casete, grabar, latencia)
+        self.db = db or DatabaseManager()
+        self.titulo_busqueda = titulo_busqueda or JobMonitorConfig.CRITERIOS["titulo_busqueda"]
+        self.perfiles = perfiles or [{"nombre": "principal", "titulos": [self.titulo_busqueda]}]
+    
+    def _get(self, url, params=None, **kwargs):
+        """GET por la sesión compartida respetando el ritmo y las pausas del host"""
+        host = urlparse(url).netloc
+        intento = 0
+        while True:
+            time.sleep(self.limitador.reservar(host))
+            try:
+                response = self.sesion.get(url, params=params, **kwargs)
+            except requests.RequestException:
+                self.limitador.registrar(host, None, intento=intento)
+                raise
+            
+            if not self.limitador.registrar(host, response.status_code,
+                                            response.headers.get("Retry-After"), intento):
+                return response
+            response.close()
+            print(f"   ⏳ {host} respondió {response.status_code}: reintento {intento + 1}")
+            intento += 1
+    
+    def _usar_casete(self, casete, grabar, latencia):
+        """Graba las respuestas reales en el casete o responde desde él"""
+        if grabar:
+            self.sesion.hooks["response"].append(casete.grabar)
+            return
+        
+        # Reproducción: sustituye a todos los adaptadores (también los por host)
+        adaptador = AdaptadorCasete(casete, latencia)
+        for prefijo in list(self.sesion.adapters):
+            self.sesion.mount(prefijo, adaptador)
+        # Sin red de por medio no hay ritmo que guardar
+        self.limitador = LimitadorHosts(peticiones_por_segundo=1e9, rafaga=1e9)
+    
+    def cerrar(self):
+        """Cierra las conexiones del pool (y guarda el casete si se está grabando)"""
+        if self.grabando:
+            self.casete.guardar()
+        self.sesion.close()
+    
+    @staticmethod
+    def parametros(portal, titulo, pagina=0, ubicacion=None):
+        """Parámetros GET de la página `pagina` (0 = primera) de la búsqueda"""
+        config = JobMonitorConfig.PORTALES[portal]
+        busqueda = config.get("busqueda", "q")
+        parametros = {busqueda: titulo, **config["parametros"]} if busqueda else dict(config["parametros"])
+        if "ubicacion" in config:
+            parametros[config["ubicacion"]] = ubicacion or JobMonitorConfig.UBICACIONES[0]
+        # La primera página va sin parámetro: misma URL (y entrada de caché) que antes
+        if pagina:
+            paginacion = config["paginacion"]
+            parametros[paginacion["parametro"]] = paginacion["inicio"] + pagina * paginacion["paso"]
+        return parametros
+    
+    def _sin_novedades(self, ofertas, vistas):
+        """True si la página no trae ninguna oferta que no esté ya en la BD"""
+        ids = {oferta["id"] for oferta in ofertas} - vistas
+        return len(self.db.ids_existentes(ids)) == len(ids)
+    
+    @staticmethod
+    def _con_posicion(ofertas, anteriores):
+        """Copia de las ofertas de una página con su posición en la búsqueda (desde 1)"""
+        # Copia: la misma lista puede llegar a otra búsqueda (PeticionesEnCurso)
+        return [dict(oferta, posicion=anteriores + i) for i, oferta in enumerate(ofertas, 1)]
+    
+    def _registrar_busqueda(self, portal, ofertas, paginas=1, sin_cambios=0):
+        """Log y mensaje de una búsqueda que ha terminado bien"""
+        # Todas las páginas respondieron 304: nada que parsear en el portal
+        if sin_cambios == paginas:
+            self._registrar_sin_cambios(portal, ofertas)
+            return
+        
+        self.db.agregar_log(
+            portal,
+            "busqueda",
+            f"Se encontraron {len(ofertas)} ofertas en {paginas} páginas"
+        )
+        print(f"   ✅ {len(ofertas)} ofertas en {JobMonitorConfig.PORTALES[portal]['nombre']} "
+              f"({paginas} páginas)")
+    
+    def _registrar_sin_cambios(self, portal, ofertas):
+        """Log y mensaje de una búsqueda respondida con 304"""
+        self.db.agregar_log(
+            portal,
+            "sin_cambios",
+            f"304: {len(ofertas)} ofertas de la caché"
+        )
+        print(f"   ♻️  Sin cambios en {JobMonitorConfig.PORTALES[portal]['nombre']} "
+              f"({len(ofertas)} ofertas de la caché)")
+    
+    def _registrar_error(self, portal, error):
+        print(f"❌ Error en {JobMonitorConfig.PORTALES[portal]['nombre']}: {error}")
+        self.db.agregar_log(portal, "error", str(error))
+    
+    @staticmethod
+    def _clave_peticion(url, parametros=None):
+        """Clave de una petición GET para PeticionesEnCurso"""
+        return url, tuple(sorted((parametros or {}).items()))
+    
+    def _descargar_pagina(self, portal, titulo, ubicacion, pagina):
+        """(ofertas, respondió 304) de una página; (None, False) si no hay página"""
+        config = JobMonitorConfig.PORTALES[portal]
+        if pagina and "paginacion" not in config:
+            return None, False  # Los feeds son una sola página
+        url = config["url"]
+        parametros = self.parametros(portal, titulo, pagina, ubicacion)
+        # Búsquedas simultáneas que piden la misma página comparten la descarga
+        return self.en_curso.ejecutar(
+            self._clave_peticion(url, parametros),
+            self._pedir_pagina, portal, url, parametros, pagina
+        )
+    
+    def _pedir_pagina(self, portal, url, parametros, pagina):
+        """Descarga y parsea una página (o la toma de la caché si responde 304)"""
+        config = JobMonitorConfig.PORTALES[portal]
+        entrada = self.cache.obtener(url, parametros) if self.cache else None
+        # stream: el cuerpo se descomprime según se lee, sin copia comprimida entera
+        response = self._get(url, parametros, headers=CacheHTTP.cabeceras_condicionales(entrada),
+                             stream=True)
+        
+        with response:
+            if response.status_code != 200:
+                response.content  # Se vacía (suele no haber cuerpo) para reutilizar la conexión
+            if response.status_code == 304 and entrada:
+                return self.cache.ofertas(entrada), True
+            if response.status_code == 404 and pagina:
+                return None, False  # No hay más páginas
+            response.raise_for_status()  # 429/403 tras los reintentos: se registra como error
+            if response.status_code != 200:
+                return None, False
+            
+            if config.get("tipo") == "feed":
+                # Se parsea según llega: el feed nunca está entero en memoria
+                lector = LectorFeed(portal)
+                bytes_cuerpo = 0
+                for bloque in response.iter_content(JobMonitorConfig.FEED_TAM_BLOQUE):
+                    lector.alimentar(bloque)
+                    bytes_cuerpo += len(bloque)
+                ofertas = lector.terminar()
+            else:
+                bytes_cuerpo = len(response.content)
+                ofertas = PARSERS[portal](response.content)
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
-                jobs = soup.find_all("div", class_="offer-item")
+            # Casetes: sin conexión real de la que contar bytes
+            if response.raw is not None:
+                self.metricas.registrar(response.raw.tell(), bytes_cuerpo)
+            else:
+                self.metricas.registrar(bytes_en_red(response.headers, bytes_cuerpo), bytes_cuerpo)
+        
+        if self.cache:
+            self.cache.guardar(url, parametros, response.headers, ofertas)
+        return ofertas, False
+    
+    @staticmethod
+    def _describir(portal, titulo, ubicacion):
+        config = JobMonitorConfig.PORTALES[portal]
+        if not config.get("busqueda", "q"):
+            return config["nombre"]
+        texto = f"{config['nombre']}: '{titulo}'"
+        return f"{texto} en {ubicacion}" if ubicacion else texto
+    
+    def buscar_en_portal(self, portal, titulo=None, ubicacion=None,
+                         max_paginas=JobMonitorConfig.SCRAPER_MAX_PAGINAS):
+        """Busca `titulo` (el configurado por defecto) en un portal, página a página
+        
+        Se para en la primera página sin ofertas nuevas (todas ya en la BD o ya
+        vistas en esta búsqueda), en una página vacía o al llegar a max_paginas.
+        """
+        titulo = titulo or self.titulo_busqueda
+        print(f"🔍 Buscando en {self._describir(portal, titulo, ubicacion)}...")
+        ofertas = []
+        vistas = set()
+        paginas = sin_cambios = anteriores = 0
+        
+        try:
+            for pagina in range(max_paginas):
+                pagina_ofertas, es_304 = self._descargar_pagina(portal, titulo, ubicacion, pagina)
+                if pagina_ofertas is None:
+                    break
+                paginas += 1
+                sin_cambios += es_304
+                # Posición como la ve el usuario: páginas anteriores + orden en esta
+                pagina_ofertas = self._con_posicion(pagina_ofertas, anteriores)
+                anteriores += len(pagina_ofertas)
                 
-                for job in jobs[:10]:
+                nuevas = [o for o in pagina_ofertas if o["id"] not in vistas]
+                ofertas.extend(nuevas)
+                if not nuevas or self._sin_novedades(nuevas, vistas):
+                    break
+                vistas.update(o["id"] for o in nuevas)
+        
+        except Exception as e:
+            self._registrar_error(portal, e)
+        
+        # Lo obtenido antes de un error en una página posterior se conserva
+        if paginas:
+            self._registrar_busqueda(portal, ofertas, paginas, sin_cambios)
+        
+        return ofertas
+    
+    def buscar_en_indeed(self):
+        """Busca ofertas en Indeed"""
+        return self.buscar_en_portal("indeed")
+    
+    def buscar_en_infojobs(self):
+        """Busca ofertas en InfoJobs"""
+        return self.buscar_en_portal("infojobs")
+    
+    def buscar_en_computrabajo(self):
+        """Busca ofertas en Computrabajo"""
+        return self.buscar_en_portal("computrabajo")
+    
+    def _descargar_detalle(self, portal, url):
+        """Detalle parseado de una oferta (None si la página no responde 200)"""
+        return self.en_curso.ejecutar(self._clave_peticion(url), self._pedir_detalle, portal, url)
+    
+    def _pedir_detalle(self, portal, url):
+        response = self._get(url)
+        if response.status_code != 200:
+            return None
+        return parsear_detalle(portal, response.content)
+    
+    def enriquecer_nuevas(self, ofertas, hilos=JobMonitorConfig.DETALLE_HILOS):
+        """Completa con su página de detalle las ofertas que aún no están en la BD
+        
+        Las ya conocidas no piden el detalle, y las URLs con detalle guardado
+        tampoco: solo se descargan las que faltan, con `hilos` a la vez.
+        """
+        existentes = self.db.ids_existentes({oferta["id"] for oferta in ofertas})
+        nuevas = [
+            oferta for oferta in ofertas
+            if oferta["id"] not in existentes
+            and oferta["url"].startswith("http")
+            and "detalle" in JobMonitorConfig.PORTALES[oferta["portal"]]
+        ]
+        if not nuevas:
+            return 0
+        
+        portales = {oferta["url"]: oferta["portal"] for oferta in nuevas}
+        detalles = self.db.detalles_guardados(portales)
+        pendientes = {url: portal for url, portal in portales.items() if url not in detalles}
+        print(f"🔎 Detalle de {len(nuevas)} ofertas nuevas "
+              f"({len(pendientes)} por descargar, {len(portales) - len(pendientes)} guardados)")
+        
+        descargados = {}
+        if pendientes:
+            executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="detalle")
+            with executor:
+                futuros = {
+                    executor.submit(self._descargar_detalle, portal, url): (url, portal)
+                    for url, portal in pendientes.items()
+                }
+                for futuro in as_completed(futuros):
+                    url, portal = futuros[futuro]
                     try:
-                        titulo_elem = job.find("h2")
-                        if not titulo_elem:
-                            continue
-                        titulo = titulo_elem.text.strip()
-                        
-                        empresa_elem = job.find("h3")
-                        empresa = empresa_elem.text.strip() if empresa_elem else "Desconocida"
-                        
-                        url_elem = job.find("a")
-                        url_job = url_elem.get("href", "") if url_elem else ""
-                        
-                        oferta_id = f"computrabajo_{titulo}_{empresa}".replace(" ", "_")
-                        
-                        oferta = {
-                            "id": oferta_id,
-                            "titulo": titulo,
-                            "empresa": empresa,
-                            "url": url_job if url_job.startswith("http") else f"https://computrabajo.com{url_job}",
-                            "salario": "No especificado",
-                            "portal": "computrabajo",
-                            "fecha_publicacion": datetime.now()
-                        }
-                        
-                        ofertas.append(oferta)
-                    
+                        detalle = futuro.result()
                     except Exception as e:
-                        print(f"⚠️ Error extrayendo oferta: {e}")
+                        self.db.agregar_log(portal, "error_detalle", f"{url}: {e}")
+                        continue
+                    if detalle:
+                        descargados[url] = detalle
+            
+            self.db.guardar_detalles(descargados)
+            detalles.update(descargados)
+        
+        completadas = 0
+        for oferta in nuevas:
+            detalle = detalles.get(oferta["url"])
+            # Página sin ninguno de los elementos esperados: se queda como estaba
+            if not detalle or all(valor is None for valor in detalle.values()):
+                continue
+            if detalle["salario"] and oferta["salario"] == "No especificado":
+                oferta["salario"] = detalle["salario"]
+            oferta["descripcion"] = detalle["descripcion"]
+            oferta["remoto"] = detalle["remoto"]
+            completadas += 1
+        
+        print(f"   ✅ {completadas} ofertas completadas con su detalle")
+        return completadas
+    
+    def busquedas(self):
+        """(portal, título, ubicación) distintos de todos los perfiles"""
+        return planificar_busquedas(self.perfiles)
+    
+    def _registrar_timeout(self, portal, titulo, ubicacion, timeout_portal):
+        print(f"⏱️  {self._describir(portal, titulo, ubicacion)} no respondió en "
+              f"{timeout_portal} s: se omite en esta ronda")
+        self.db.agregar_log(portal, "timeout", f"'{titulo}' sin respuesta en {timeout_portal} s")
+    
+    def obtener_todas_las_ofertas(self, hilos=JobMonitorConfig.SCRAPER_HILOS,
+                                  timeout_portal=JobMonitorConfig.SCRAPER_TIMEOUT_PORTAL):
+        """Ejecuta todas las búsquedas planificadas a la vez y une los resultados"""
+        # Los logs llegan desde varios hilos: tienen que pasar por la cola
+        if self.db.escritor_logs is None:
+            self.db.iniciar_escritor_logs()
+        
+        resultados = []
+        inicios = {}
+        busquedas = self.busquedas()
+        
+        # Solo `hilos` búsquedas a la vez, pero cada una con su propio hilo: al
+        # vencer el plazo de una colgada se libera su plaza y entra la siguiente
+        # aunque su hilo siga bloqueado en la petición
+        plazas = threading.Semaphore(hilos)
+        liberadas = set()
+        bloqueo = threading.Lock()
+        terminado = threading.Event()
+        
+        def liberar(busqueda):
+            with bloqueo:
+                if busqueda in liberadas:
+                    return
+                liberadas.add(busqueda)
+            plazas.release()
+        
+        def buscar(busqueda):
+            plazas.acquire()
+            try:
+                if terminado.is_set():
+                    return []
+                inicios[busqueda] = time.monotonic()
+                return self.buscar_en_portal(*busqueda)
+            finally:
+                liberar(busqueda)
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(len(busquedas), JobMonitorConfig.SCRAPER_HILOS_MAX)),
+            thread_name_prefix="portal"
+        )
+        pendientes = {executor.submit(buscar, busqueda): busqueda for busqueda in busquedas}
+        
+        try:
+            while pendientes:
+                terminados, _ = wait(pendientes, timeout=1, return_when=FIRST_COMPLETED)
                 
-                self.db.agregar_log(
-                    "computrabajo",
-                    "busqueda",
-                    f"Se encontraron {len(ofertas)} ofertas"
+                # Se añaden en cuanto llegan, sin esperar a la búsqueda más lenta
+                for futuro in terminados:
+                    portal, titulo, _ = pendientes.pop(futuro)
+                    try:
+                        resultados.append(futuro.result())
+                    except Exception as e:
+                        print(f"❌ Error en {portal}: {e}")
+                        self.db.agregar_log(portal, "error", str(e))
+                
+                # El plazo cuenta desde que la búsqueda empezó, no desde que se encoló
+                ahora = time.monotonic()
+                for futuro, busqueda in list(pendientes.items()):
+                    if busqueda in inicios and ahora - inicios[busqueda] > timeout_portal:
+                        del pendientes[futuro]
+                        self._registrar_timeout(*busqueda, timeout_portal)
+                        liberar(busqueda)
+        finally:
+            # No se espera a las búsquedas colgadas; las que no empezaron se
+            # cancelan y las que esperaban plaza se despiertan para salir
+            terminado.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            for _ in busquedas:
+                plazas.release()
+        
+        return fusionar_ofertas(resultados)
+
+
+class PortalScraperAsync(PortalScraper):
+    """PortalScraper con todas las búsquedas planificadas en un solo event loop"""
+    
+    def __init__(self, titulo_busqueda=None, db=None,
+                 concurrencia=JobMonitorConfig.ASYNC_CONCURRENCIA, **kwargs):
+        super().__init__(titulo_busqueda, db, **kwargs)
+        self.concurrencia = concurrencia
+    
+    async def _descargar_pagina_async(self, sesion, semaforo, parseo, portal, titulo, ubicacion, pagina):
+        """Versión asíncrona de _descargar_pagina (parsea fuera del loop)"""
+        config = JobMonitorConfig.PORTALES[portal]
+        if pagina and "paginacion" not in config:
+            return None, False
+        url = config["url"]
+        parametros = self.parametros(portal, titulo, pagina, ubicacion)
+        return await self.en_curso.ejecutar_async(
+            self._clave_peticion(url, parametros),
+            lambda: self._pedir_pagina_async(sesion, semaforo, parseo, portal, url, parametros, pagina)
+        )
+    
+    async def _pedir_pagina_async(self, sesion, semaforo, parseo, portal, url, parametros, pagina):
+        """Versión asíncrona de _pedir_pagina"""
+        config = JobMonitorConfig.PORTALES[portal]
+        loop = asyncio.get_running_loop()
+        # La caché lee y escribe ficheros: en un hilo, para no parar el loop
+        entrada = None
+        if self.cache:
+            entrada = await loop.run_in_executor(None, self.cache.obtener, url, parametros)
+        host = urlparse(url).netloc
+        
+        intento = 0
+        while True:
+            # Mismo limitador que el motor de hilos, pero esperando sin bloquear el loop
+            await asyncio.sleep(self.limitador.reservar(host))
+            try:
+                async with semaforo:
+                    async with sesion.get(url, params=parametros,
+                                          headers=CacheHTTP.cabeceras_condicionales(entrada)) as response:
+                        reintentar = self.limitador.registrar(
+                            host, response.status, response.headers.get("Retry-After"), intento
+                        )
+                        if not reintentar:
+                            if response.status == 304 and entrada:
+                                return self.cache.ofertas(entrada), True
+                            if response.status == 404 and pagina:
+                                return None, False
+                            response.raise_for_status()
+                            if response.status != 200:
+                                return None, False
+                            cabeceras = response.headers
+                            if config.get("tipo") == "feed":
+                                # Parsear un feed es barato: se hace en el loop según llega
+                                lector = LectorFeed(portal)
+                                bytes_cuerpo = 0
+                                async for bloque in response.content.iter_chunked(
+                                    JobMonitorConfig.FEED_TAM_BLOQUE
+                                ):
+                                    lector.alimentar(bloque)
+                                    bytes_cuerpo += len(bloque)
+                                ofertas = lector.terminar()
+                                self.metricas.registrar(
+                                    bytes_en_red(cabeceras, bytes_cuerpo), bytes_cuerpo
+                                )
+                                if self.cache:
+                                    await loop.run_in_executor(
+                                        None, self.cache.guardar, url, parametros, cabeceras, ofertas
+                                    )
+                                return ofertas, False
+                            # aiohttp descomprime al leer y no cuenta los bytes
+                            # comprimidos: se toman de Content-Length
+                            contenido = await response.read()
+                            self.metricas.registrar(
+                                bytes_en_red(cabeceras, len(contenido)), len(contenido)
+                            )
+                            break
+            except (self._aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.limitador.registrar(host, None, intento=intento)
+                raise
+            
+            print(f"   ⏳ {host} respondió {response.status}: reintento {intento + 1}")
+            intento += 1
+        
+        # BeautifulSoup bloquea: el loop sigue atendiendo descargas mientras tanto
+        ofertas = await loop.run_in_executor(parseo, PARSERS[portal], contenido)
+        if self.cache:
+            await loop.run_in_executor(
+                None, self.cache.guardar, url, parametros, cabeceras, ofertas
+            )
+        return ofertas, False
+    
+    async def _buscar_async(self, sesion, semaforo, parseo, portal, titulo, ubicacion,
+                            max_paginas=JobMonitorConfig.SCRAPER_MAX_PAGINAS):
+        """Mismo recorrido de páginas y resultado que buscar_en_portal"""
+        print(f"🔍 Buscando en {self._describir(portal, titulo, ubicacion)}...")
+        ofertas = []
+        vistas = set()
+        paginas = sin_cambios = anteriores = 0
+        
+        try:
+            # Las páginas de una búsqueda van en serie: cada una decide si hay otra
+            for pagina in range(max_paginas):
+                pagina_ofertas, es_304 = await self._descargar_pagina_async(
+                    sesion, semaforo, parseo, portal, titulo, ubicacion, pagina
                 )
-                print(f"   ✅ {len(ofertas)} ofertas en Computrabajo")
+                if pagina_ofertas is None:
+                    break
+                paginas += 1
+                sin_cambios += es_304
+                # Posición como la ve el usuario: páginas anteriores + orden en esta
+                pagina_ofertas = self._con_posicion(pagina_ofertas, anteriores)
+                anteriores += len(pagina_ofertas)
+                
+                nuevas = [o for o in pagina_ofertas if o["id"] not in vistas]
+                ofertas.extend(nuevas)
+                if not nuevas:
+                    break
+                # Consulta a SQLite: en un hilo, para no parar las demás búsquedas
+                loop = asyncio.get_running_loop()
+                if await loop.run_in_executor(None, self._sin_novedades, nuevas, vistas):
+                    break
+                vistas.update(o["id"] for o in nuevas)
         
         except Exception as e:
-            print(f"❌ Error en Computrabajo: {e}")
-            self.db.agregar_log("computrabajo", "error", str(e))
+            self._registrar_error(portal, e)
+        
+        if paginas:
+            self._registrar_busqueda(portal, ofertas, paginas, sin_cambios)
         
         return ofertas
     
-    def obtener_todas_las_ofertas(self):
-        """Ejecuta búsqueda en todos los portales"""
-        todas_ofertas = []
+    async def _buscar_todo(self, aiohttp, timeout_portal):
+        """Lanza todas las búsquedas y junta las ofertas según terminan"""
+        self._aiohttp = aiohttp
+        conexion, lectura = JobMonitorConfig.HTTP_TIMEOUT
+        sesion = aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(sock_connect=conexion, sock_read=lectura),
+            connector=aiohttp.TCPConnector(
+                limit=self.concurrencia,
+                limit_per_host=max(JobMonitorConfig.HTTP_POOL_POR_HOST.values())
+            )
+        )
+        semaforo = asyncio.Semaphore(self.concurrencia)
         
-        todas_ofertas.extend(self.buscar_en_indeed())
-        todas_ofertas.extend(self.buscar_en_infojobs())
-        todas_ofertas.extend(self.buscar_en_computrabajo())
+        if JobMonitorConfig.ASYNC_PROCESOS_PARSEO:
+            parseo = ProcessPoolExecutor(JobMonitorConfig.ASYNC_PROCESOS_PARSEO)
+        else:
+            parseo = ThreadPoolExecutor(thread_name_prefix="parseo")
+        
+        resultados = []
+        try:
+            async with sesion:
+                tareas = [
+                    self._con_plazo(
+                        self._buscar_async(sesion, semaforo, parseo, *busqueda),
+                        busqueda,
+                        timeout_portal
+                    )
+                    for busqueda in self.busquedas()
+                ]
+                for tarea in asyncio.as_completed(tareas):
+                    resultados.append(await tarea)
+        finally:
+            parseo.shutdown(wait=False, cancel_futures=True)
         
-        return todas_ofertas
+        return fusionar_ofertas(resultados)
+    
+    async def _con_plazo(self, corrutina, busqueda, timeout_portal):
+        """Cancela la búsqueda si supera el plazo"""
+        try:
+            return await asyncio.wait_for(corrutina, timeout_portal)
+        except asyncio.TimeoutError:
+            self._registrar_timeout(*busqueda, timeout_portal)
+            return []
+    
+    def obtener_todas_las_ofertas(self, hilos=JobMonitorConfig.SCRAPER_HILOS,
+                                  timeout_portal=JobMonitorConfig.SCRAPER_TIMEOUT_PORTAL):
+        """Ejecuta todas las búsquedas en un event loop (hilos si falta aiohttp)"""
+        try:
+            import aiohttp
+        except ImportError:
+            aiohttp = None
+            print("⚠️  El motor asyncio necesita aiohttp (pip install aiohttp): se usan hilos")
+        
+        # Los casetes se enganchan a la sesión de requests: van por el motor de hilos
+        if aiohttp is None or self.casete is not None:
+            return super().obtener_todas_las_ofertas(hilos, timeout_portal)
+        
+        return asyncio.run(self._buscar_todo(aiohttp, timeout_portal))
 
 
 # ============================================================================
@@ -449,10 +2780,20 @@ class PortalScraper:
 class JobMonitor:
     """Coordina el monitoreo completo"""
     
-    def __init__(self, titulo_busqueda=None):
-        self.db = DatabaseManager()
+    def __init__(self, titulo_busqueda=None, db_name=JobMonitorConfig.DB_NAME,
+                 casete=None, grabar=False, latencia=JobMonitorConfig.HTTP_CASETE_LATENCIA):
+        self.db = DatabaseManager(db_name)
+        self.db.iniciar_escritor_logs()
         self.titulo_busqueda = titulo_busqueda or JobMonitorConfig.CRITERIOS["titulo_busqueda"]
-        self.scraper = PortalScraper(self.titulo_busqueda)
+        # Varios títulos separados por comas: un perfil más junto a los configurados
+        titulos = [t.strip() for t in self.titulo_busqueda.split(",") if t.strip()] or [
+            JobMonitorConfig.CRITERIOS["titulo_busqueda"]
+        ]
+        self.perfiles = [{"nombre": "principal", "titulos": titulos}] + JobMonitorConfig.PERFILES
+        # Los dos motores devuelven las mismas ofertas
+        motor = PortalScraperAsync if JobMonitorConfig.SCRAPER_MOTOR == "asyncio" else PortalScraper
+        self.scraper = motor(titulos[0], db=self.db, perfiles=self.perfiles,
+                             casete=casete, grabar=grabar, latencia=latencia)
         self.file_manager = FileManager()
     
     def ejecutar_monitoreo(self):
@@ -463,20 +2804,48 @@ class JobMonitor:
         print(f"{'='*70}\n")
         
         # Obtener ofertas de todos los portales
-        todas_ofertas = self.scraper.obtener_todas_las_ofertas()
+        compartidas = self.scraper.en_curso.compartidas
+        self.scraper.metricas.reiniciar()
+        medir_memoria = JobMonitorConfig.HTTP_MEDIR_MEMORIA and not tracemalloc.is_tracing()
+        if medir_memoria:
+            tracemalloc.start()
+        try:
+            todas_ofertas = self.scraper.obtener_todas_las_ofertas()
+        finally:
+            if medir_memoria:
+                pico = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
         print(f"\n📊 Total de ofertas encontradas: {len(todas_ofertas)}")
+        if self.scraper.metricas.paginas:
+            print(self.scraper.metricas.resumen())
+        if medir_memoria:
+            print(f"🧮 Pico de memoria de la búsqueda: {pico / 1024 / 1024:.2f} MB")
+        compartidas = self.scraper.en_curso.compartidas - compartidas
+        if compartidas:
+            print(f"🔗 {compartidas} páginas compartidas con una petición igual en curso o reciente")
         
-        ofertas_nuevas = []
+        # Salario, descripción y remoto de la página de cada oferta nueva
+        if JobMonitorConfig.DETALLE_ACTIVO:
+            self.scraper.enriquecer_nuevas(todas_ofertas)
         
-        # Procesar cada oferta
-        for oferta in todas_ofertas:
-            if not self.db.oferta_existe(oferta["id"]):
-                # Oferta nueva - guardar y guardar en TXT
-                self.db.guardar_oferta(oferta)
-                self.file_manager.guardar_oferta_txt(oferta)
-                ofertas_nuevas.append(oferta)
-            else:
-                print(f"⏭️  Oferta duplicada: {oferta['titulo']}")
+        # Filtrar y guardar las nuevas en una sola consulta + un solo INSERT,
+        # y registrar la ronda con todos los avistamientos en la misma transacción
+        with self.db.transaccion():
+            ofertas_nuevas = self.db.registrar_ofertas_nuevas(todas_ofertas)
+            self.db.registrar_ronda(todas_ofertas, len(ofertas_nuevas))
+        
+        for oferta in ofertas_nuevas:
+            self.file_manager.guardar_oferta_txt(oferta)
+        
+        duplicadas = len(todas_ofertas) - len(ofertas_nuevas)
+        if duplicadas:
+            print(f"⏭️  {duplicadas} ofertas duplicadas")
+        
+        if self.db.indice is not None:
+            stats = self.db.indice.estadisticas()
+            print(f"🧠 Índice en memoria: {stats['ids']} ids, "
+                  f"{stats['tasa_acierto']:.1%} resueltas sin BD "
+                  f"({stats['consultas_bd']} consultas a BD)")
         
         # Resumen
         if ofertas_nuevas:
@@ -490,7 +2859,9 @@ class JobMonitor:
         """Genera resumen diario de ofertas"""
         print(f"\n📊 Generando resumen diario...")
         
-        ofertas_hoy = self.db.obtener_ofertas_del_dia()
+        # Los contadores dicen al instante si hay algo que resumir y por portal
+        estadisticas = self.db.estadisticas_del_dia()
+        ofertas_hoy = self.db.obtener_ofertas_del_dia() if estadisticas else []
         
         if ofertas_hoy:
             ofertas_dict = [
@@ -503,11 +2874,107 @@ class JobMonitor:
                 }
                 for o in ofertas_hoy
             ]
-            self.file_manager.guardar_resumen_txt(ofertas_dict)
+            self.file_manager.guardar_resumen_txt(ofertas_dict, estadisticas)
             print(f"✅ Resumen guardado: {len(ofertas_hoy)} ofertas del día")
+            for estadistica in estadisticas:
+                print(f"   {resumen_estadistica(estadistica)}")
         else:
             print("⏭️  No hay ofertas del día para resumir")
     
+    def buscar(self, texto, limite=20):
+        """Busca en el histórico de ofertas y muestra los resultados"""
+        inicio = time.perf_counter()
+        resultados = self.db.buscar_ofertas(texto, limite)
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        
+        print(f"\n🔎 {len(resultados)} resultados para '{texto}' ({milisegundos:.1f} ms)\n")
+        
+        for i, (titulo, empresa, url, salario, portal, fecha) in enumerate(resultados, 1):
+            print(f"{i}. {titulo}")
+            print(f"   🏢 {empresa}  🌐 {portal}  💰 {salario}")
+            print(f"   🔗 {url}")
+            print(f"   ⏰ {str(fecha)[:16]}\n")
+        
+        return resultados
+    
+    def mostrar_estadisticas(self, dias=7):
+        """Muestra los contadores de los últimos días (no recorre las ofertas)"""
+        hoy = datetime.now().date()
+        filas = self.db.estadisticas_diarias(hoy - timedelta(days=dias - 1), hoy + timedelta(days=1))
+        
+        print(f"\n📊 Ofertas nuevas de los últimos {dias} días:\n")
+        if not filas:
+            print("⏭️  No hay ofertas en ese periodo")
+        
+        dia = None
+        for estadistica in filas:
+            if estadistica["dia"] != dia:
+                dia = estadistica["dia"]
+                total = sum(e["ofertas"] for e in filas if e["dia"] == dia)
+                print(f"📅 {dia}: {total} ofertas")
+            print(f"   {resumen_estadistica(estadistica)}")
+        
+        return filas
+    
+    def mostrar_permanencia(self, limite=20):
+        """Muestra cuánto tiempo llevan publicadas las ofertas más persistentes"""
+        filas = self.db.permanencia_ofertas(limite)
+        
+        print(f"\n📈 Ofertas que más tiempo llevan publicadas:\n")
+        for i, (titulo, empresa, portal, primera, ultima, rondas, posicion) in enumerate(filas, 1):
+            print(f"{i}. {titulo} - {empresa} ({portal})")
+            print(f"   👀 {rondas} rondas, posición media {posicion:.1f}")
+            print(f"   ⏰ {str(primera)[:16]} → {str(ultima)[:16]}\n")
+        
+        # El histórico completo (avistamientos y rondas) sale con la exportación columnar
+        print(f"💡 Todos los avistamientos: python job_monitor_txt_2.py export "
+              f"[{JobMonitorConfig.EXPORT_DIR}] [parquet|arrow]")
+    
+    def exportar(self, directorio=JobMonitorConfig.EXPORT_DIR, formato="parquet"):
+        """Exporta el histórico a ficheros columnares para analizarlo aparte"""
+        print(f"\n📦 Exportando histórico a {directorio}/ ({formato})...")
+        
+        inicio = time.perf_counter()
+        resultados = self.db.exportar_columnar(directorio, formato)
+        
+        for tabla, (ruta, total) in resultados.items():
+            print(f"   ✅ {tabla}: {total} filas → {ruta}")
+        if resultados:
+            print(f"⏱️  Exportación completada en {time.perf_counter() - inicio:.1f} s")
+    
+    def reproducir(self, rondas=1):
+        """Ejecuta varias rondas completas (con casete: sin red) y mide cada una"""
+        tiempos = []
+        for ronda in range(1, rondas + 1):
+            inicio = time.perf_counter()
+            self.ejecutar_monitoreo()
+            tiempos.append(time.perf_counter() - inicio)
+            print(f"⏱️  Ronda {ronda}: {tiempos[-1]:.3f} s")
+        
+        casete = self.scraper.casete
+        print(f"\n📼 {rondas} rondas en {sum(tiempos):.2f} s "
+              f"(media {sum(tiempos) / len(tiempos):.3f} s, mejor {min(tiempos):.3f} s)")
+        if casete is not None:
+            print(f"   {casete.reproducidas} respuestas del casete, {casete.sin_grabar} sin grabar")
+        return tiempos
+    
+    def mantenimiento(self):
+        """Resume y purga los logs antiguos"""
+        print(f"\n🧹 Mantenimiento de la BD...")
+        
+        # Que los logs encolados lleguen antes de calcular el corte
+        if self.db.escritor_logs is not None:
+            self.db.escritor_logs.cerrar()
+            self.db.escritor_logs = None
+        
+        try:
+            purgados = self.db.mantenimiento()
+            print(f"✅ {purgados} logs de más de {JobMonitorConfig.LOGS_RETENCION_DIAS} días resumidos y purgados")
+        except sqlite3.Error as e:
+            print(f"❌ Error en el mantenimiento: {e}")
+        finally:
+            self.db.iniciar_escritor_logs()
+    
     def programar(self):
         """Programa el monitoreo automático"""
         
@@ -516,15 +2983,25 @@ class JobMonitor:
         # Limpiar archivo de ofertas al iniciar
         self.file_manager.limpiar_ofertas()
         
+        # Cargar una vez los ids conocidos para no consultar la BD en cada ronda
+        indice = self.db.cargar_indice()
+        print(f"🧠 {len(indice.huellas)} ofertas conocidas cargadas en memoria")
+        if not indice.completo:
+            print(f"⚠️  Límite de {indice.max_ids} ids alcanzado: el resto se consulta en la BD")
+        
         # Monitorear cada 2 horas
         schedule.every(2).hours.do(self.ejecutar_monitoreo)
         
         # Resumen diario a las 9:00 PM
         schedule.every().day.at("21:00").do(self.generar_resumen_diario)
         
+        # Mantenimiento de la BD de madrugada
+        schedule.every().day.at("04:00").do(self.mantenimiento)
+        
         print("✅ Programación completada")
         print("⏰ Monitoreo cada 2 horas")
-        print(f"📊 Resumen diario a las 21:00 en {JobMonitorConfig.RESUMEN_FILE}\n")
+        print(f"📊 Resumen diario a las 21:00 en {JobMonitorConfig.RESUMEN_FILE}")
+        print("🧹 Mantenimiento de la BD a las 04:00\n")
         
         print(f"Archivos de salida:")
         print(f"  📄 Ofertas nuevas: {JobMonitorConfig.OFERTAS_FILE}")
@@ -538,6 +3015,13 @@ class JobMonitor:
                 time.sleep(60)  # Verificar cada minuto
         except KeyboardInterrupt:
             print("\n\n👋 Monitoreo detenido por el usuario")
+        finally:
+            self.cerrar()
+    
+    def cerrar(self):
+        """Cierra las conexiones HTTP, vuelca los logs pendientes y libera la BD"""
+        self.scraper.cerrar()
+        self.db.cerrar()
 
 
 # ============================================================================
@@ -545,6 +3029,56 @@ class JobMonitor:
 # ============================================================================
 
 if __name__ == "__main__":
+    # Modo no interactivo: python job_monitor_txt_2.py export [directorio] [parquet|arrow]
+    if sys.argv[1:2] == ["export"]:
+        directorio = sys.argv[2] if len(sys.argv) > 2 else JobMonitorConfig.EXPORT_DIR
+        formato = sys.argv[3] if len(sys.argv) > 3 else "parquet"
+        monitor = JobMonitor()
+        monitor.exportar(directorio, formato)
+        monitor.cerrar()
+        sys.exit(0)
+    
+    # Casetes: python job_monitor_txt_2.py grabar|reproducir|casete-debug <casete.json.gz> ...
+    #   grabar <casete> [título]                  una ronda real guardando las respuestas
+    #   reproducir <casete> [rondas] [latencia_s] [título]  rondas sin red sobre una BD temporal
+    #   casete-debug <casete> [título]            casete con los debug_*.html guardados
+    if sys.argv[1:2] in (["grabar"], ["reproducir"], ["casete-debug"]) and len(sys.argv) > 2:
+        modo, ruta = sys.argv[1], sys.argv[2]
+        
+        if modo == "casete-debug":
+            casete = Casete.desde_html_debug(ruta, sys.argv[3] if len(sys.argv) > 3 else None)
+            casete.guardar()
+            print(f"📼 {len(casete.respuestas)} respuestas guardadas en {ruta}")
+        
+        elif modo == "grabar":
+            monitor = JobMonitor(sys.argv[3] if len(sys.argv) > 3 else None,
+                                 casete=Casete(ruta), grabar=True)
+            monitor.ejecutar_monitoreo()
+            monitor.cerrar()
+            print(f"📼 Casete guardado en {ruta}")
+        
+        else:
+            rondas = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+            latencia = float(sys.argv[4]) if len(sys.argv) > 4 else JobMonitorConfig.HTTP_CASETE_LATENCIA
+            # Todo lo que escribe el monitor va a un directorio temporal
+            directorio = tempfile.mkdtemp(prefix="job_monitor_casete_")
+            JobMonitorConfig.OFERTAS_FILE = os.path.join(directorio, JobMonitorConfig.OFERTAS_FILE)
+            monitor = JobMonitor(sys.argv[5] if len(sys.argv) > 5 else None,
+                                 db_name=os.path.join(directorio, "job_monitor.db"),
+                                 casete=Casete(ruta), latencia=latencia)
+            monitor.reproducir(rondas)
+            monitor.cerrar()
+            print(f"📂 BD y ficheros de la reproducción en {directorio}")
+        sys.exit(0)
+    
+    # Modo no interactivo: python job_monitor_txt_2.py stats [días]
+    if sys.argv[1:2] == ["stats"]:
+        dias = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+        monitor = JobMonitor()
+        monitor.mostrar_estadisticas(dias)
+        monitor.cerrar()
+        sys.exit(0)
+    
     print("""
     ╔═══════════════════════════════════════╗
     ║     JOB MONITOR - Backend Remote      ║
@@ -557,7 +3091,8 @@ if __name__ == "__main__":
     # Pedir título de búsqueda al usuario
     print("📝 Configura tu búsqueda:\n")
     
-    titulo_busqueda = input("Ingresa el título a buscar (ej: 'backend remote java'): ").strip()
+    titulo_busqueda = input("Ingresa el título a buscar, varios separados por comas "
+                            "(ej: 'backend remote java, spring boot'): ").strip()
     
     if not titulo_busqueda:
         titulo_busqueda = JobMonitorConfig.CRITERIOS["titulo_busqueda"]
@@ -571,15 +3106,37 @@ if __name__ == "__main__":
     print("Selecciona una opción:")
     print("1️⃣  Ejecutar monitoreo ahora (una sola vez)")
     print("2️⃣  Programar monitoreo automático (24/7)")
-    print("3️⃣  Salir\n")
+    print("3️⃣  Mantenimiento de la BD (purgar logs antiguos)")
+    print("4️⃣  Buscar en el histórico de ofertas")
+    print("5️⃣  Permanencia de ofertas")
+    print("6️⃣  Exportar histórico a Parquet")
+    print("7️⃣  Estadísticas de los últimos 7 días")
+    print("8️⃣  Salir\n")
     
-    opcion = input("Tu opción (1-3): ").strip()
+    opcion = input("Tu opción (1-8): ").strip()
     
     if opcion == "1":
         monitor.ejecutar_monitoreo()
+        monitor.cerrar()
         print("✅ Monitoreo completado")
         print(f"Ver ofertas en: {JobMonitorConfig.OFERTAS_FILE}")
     elif opcion == "2":
         monitor.programar()
+    elif opcion == "3":
+        monitor.mantenimiento()
+        monitor.cerrar()
+    elif opcion == "4":
+        texto = input("Palabras a buscar (ej: 'spring boot'): ").strip()
+        monitor.buscar(texto)
+        monitor.cerrar()
+    elif opcion == "5":
+        monitor.mostrar_permanencia()
+        monitor.cerrar()
+    elif opcion == "6":
+        monitor.exportar()
+        monitor.cerrar()
+    elif opcion == "7":
+        monitor.mostrar_estadisticas()
+        monitor.cerrar()
     else:
         print("👋 Saliendo...")
\ No newline at end of file
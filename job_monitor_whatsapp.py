@@ -8,13 +8,17 @@ Fecha: 2025
 import requests
 import json
 import sqlite3
-from datetime import datetime
-from bs4 import BeautifulSoup
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from bs4 import BeautifulSoup, FeatureNotFound
 import schedule
 import time
 import os
+import threading
 from urllib.parse import urlencode
 
+from job_monitor_comun import BaseDatosOfertas, huella_oferta
+
 # ============================================================================
 # CONFIGURACIÓN INICIAL
 # ============================================================================
@@ -30,6 +34,18 @@ class JobMonitorConfig:
     
     # Base de datos
     DB_NAME = "job_monitor.db"
+    DB_LOTE_IN = 500  # Ids por consulta IN (...) al filtrar ofertas nuevas
+    
+    # Bandeja de salida (outbox) de WhatsApp
+    OUTBOX_INTERVALO = 30  # Segundos entre pasadas del despachador
+    OUTBOX_LOTE = 20  # Mensajes enviados por pasada
+    OUTBOX_MAX_INTENTOS = 5  # Después se deja de reintentar el mensaje
+    OUTBOX_ESPERA_BASE = 60  # Segundos de espera tras el 1er fallo (se duplica)
+    TWILIO_TIMEOUT = 10  # Segundos máximos por llamada a Twilio
+    
+    # Parser de las páginas: "html.parser" (sin dependencias) o "lxml"
+    # (pip install lxml): el mismo árbol de BeautifulSoup, varias veces más rápido
+    HTML_PARSER = "html.parser"
     
     # Criterios de búsqueda
     CRITERIOS = {
@@ -68,22 +84,81 @@ class JobMonitorConfig:
 # MANEJO DE BASE DE DATOS
 # ============================================================================
 
-class DatabaseManager:
+def resumen_estadistica(estadistica):
+    """Una línea legible con los contadores de un portal en un día"""
+    linea = f"• {estadistica['portal'].upper()}: {estadistica['ofertas']} ofertas"
+    if estadistica["con_salario"]:
+        euros = lambda valor: f"{valor:,.0f}".replace(",", ".") + " €"
+        linea += (f", salario medio {euros(estadistica['salario_medio'])} "
+                  f"({euros(estadistica['salario_min'])} - {euros(estadistica['salario_max'])})")
+    return linea
+
+
+class DatabaseManager(BaseDatosOfertas):
     """Gestiona la base de datos SQLite local"""
     
     def __init__(self, db_name=JobMonitorConfig.DB_NAME):
         self.db_name = db_name
+        self.conn = None
+        self._en_transaccion = False
         self.crear_tablas()
     
+    def conectar(self):
+        """Devuelve la conexión persistente (la abre la primera vez)"""
+        if self.conn is None:
+            # Una sola conexión por proceso: sqlite3 cachea las sentencias
+            # preparadas por conexión, así que reutilizarla evita recompilarlas
+            self.conn = sqlite3.connect(self.db_name)
+            # WAL: las lecturas no bloquean la escritura y el commit es más barato
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            # Permite calcular la huella dentro de SQL (migración)
+            self.conn.create_function("huella", 1, huella_oferta, deterministic=True)
+        return self.conn
+    
+    def cerrar(self):
+        """Cierra la conexión persistente"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias operaciones en una única transacción explícita"""
+        conn = self.conectar()
+        
+        # Transacción anidada: la confirma la más externa
+        if self._en_transaccion:
+            yield conn
+            return
+        
+        self._en_transaccion = True
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._en_transaccion = False
+    
+    def _confirmar(self):
+        """Hace commit salvo que estemos dentro de transaccion()"""
+        if not self._en_transaccion:
+            self.conn.commit()
+    
     def crear_tablas(self):
         """Crea las tablas si no existen"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         
         # Tabla de ofertas ya procesadas
+        # clave = huella de 64 bits del id: la PK es un entero fijo (alias del
+        # rowid) en vez de un texto largo; el id original se guarda aparte
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS ofertas (
-                id TEXT PRIMARY KEY,
+                clave INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
                 titulo TEXT,
                 empresa TEXT,
                 url TEXT,
@@ -91,10 +166,58 @@ class DatabaseManager:
                 portal TEXT,
                 fecha_publicacion TIMESTAMP,
                 fecha_encontrada TIMESTAMP,
-                enviada_whatsapp INTEGER DEFAULT 0
+                enviada_whatsapp INTEGER DEFAULT 0,
+                clave_verificada INTEGER DEFAULT 0
+            )
+        """)
+        
+        # BDs creadas con la versión anterior (id TEXT PRIMARY KEY)
+        self._migrar_a_clave_hash(conn)
+        
+        # BDs creadas por los otros job_monitor_*.py no traen la columna
+        columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(ofertas)")]
+        if "enviada_whatsapp" not in columnas:
+            cursor.execute("ALTER TABLE ofertas ADD COLUMN enviada_whatsapp INTEGER DEFAULT 0")
+        
+        # Contadores por día/portal de las ofertas nuevas: se actualizan en la
+        # misma transacción que cada INSERT, así los resúmenes no leen ofertas
+        nueva_estadisticas = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'estadisticas_diarias'"
+        ).fetchone() is None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS estadisticas_diarias (
+                dia DATE,
+                portal TEXT,
+                ofertas INTEGER DEFAULT 0,
+                con_salario INTEGER DEFAULT 0,
+                salario_suma REAL DEFAULT 0,
+                salario_min REAL,
+                salario_max REAL,
+                PRIMARY KEY (dia, portal)
+            ) WITHOUT ROWID
+        """)
+        
+        # Bandeja de salida: mensajes pendientes de enviar por WhatsApp.
+        # Se rellena en la misma transacción que guarda las ofertas, así que
+        # un mensaje nunca se pierde aunque el proceso caiga antes de enviarlo
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                clave INTEGER,
+                mensaje TEXT NOT NULL,
+                creado TIMESTAMP,
+                intentos INTEGER DEFAULT 0,
+                siguiente_intento TIMESTAMP,
+                enviado TIMESTAMP
             )
         """)
         
+        # Parcial: el despachador solo recorre los pendientes
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_outbox_pendientes
+            ON outbox (id) WHERE enviado IS NULL
+        """)
+        
         # Tabla de log de actividad
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS logs (
@@ -106,28 +229,39 @@ class DatabaseManager:
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Parcial: solo contiene las filas insertadas sin huella (normalmente ninguna)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ofertas_sin_verificar
+            ON ofertas (clave_verificada) WHERE clave_verificada = 0
+        """)
+        
+        self._confirmar()
+        # También crea el índice único de id (ver BaseDatosOfertas)
+        self._reparar_claves(conn)
+        
+        # Primera vez con contadores: se calculan con el histórico existente
+        if nueva_estadisticas:
+            self.recalcular_estadisticas()
     
     def oferta_existe(self, oferta_id):
         """Verifica si la oferta ya está en la BD"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM ofertas WHERE id = ?", (oferta_id,))
+        cursor.execute("SELECT id FROM ofertas WHERE clave = ?", (huella_oferta(oferta_id),))
         resultado = cursor.fetchone()
-        conn.close()
         return resultado is not None
     
-    def guardar_oferta(self, oferta):
-        """Guarda una nueva oferta en la BD"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO ofertas (id, titulo, empresa, url, salario, portal, 
-                                fecha_publicacion, fecha_encontrada)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+    SQL_INSERTAR_OFERTA = """
+        INSERT INTO ofertas (clave, id, titulo, empresa, url, salario, portal, 
+                            fecha_publicacion, fecha_encontrada, clave_verificada)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+    """
+    
+    @staticmethod
+    def _fila_oferta(oferta, fecha_encontrada):
+        """Convierte el dict de una oferta en la tupla del INSERT"""
+        return (
+            huella_oferta(oferta["id"]),
             oferta["id"],
             oferta["titulo"],
             oferta["empresa"],
@@ -135,33 +269,137 @@ class DatabaseManager:
             oferta["salario"],
             oferta["portal"],
             oferta["fecha_publicacion"],
-            datetime.now()
-        ))
-        
-        conn.commit()
-        conn.close()
+            fecha_encontrada
+        )
     
-    def marcar_como_enviada(self, oferta_id):
-        """Marca oferta como enviada por WhatsApp"""
-        conn = sqlite3.connect(self.db_name)
+    def guardar_oferta(self, oferta):
+        """Guarda una nueva oferta en la BD"""
+        conn = self.conectar()
         cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE ofertas SET enviada_whatsapp = 1 WHERE id = ?",
-            (oferta_id,)
+        ahora = datetime.now()
+        cursor.execute(self.SQL_INSERTAR_OFERTA, self._fila_oferta(oferta, ahora))
+        self._acumular_estadisticas(conn, [(ahora, oferta["portal"], oferta["salario"])])
+        self._confirmar()
+    
+    def ids_existentes(self, ids):
+        """Devuelve cuáles de los ids ya están en la BD (IN por bloques)"""
+        conn = self.conectar()
+        ids = list(ids)
+        existentes = set()
+        
+        # Se consulta por huella (PK entera) y se traduce de vuelta al id
+        por_huella = {huella_oferta(oferta_id): oferta_id for oferta_id in ids}
+        huellas = list(por_huella)
+        
+        # Bloques por debajo del límite de parámetros de SQLite
+        tamano = JobMonitorConfig.DB_LOTE_IN
+        for inicio in range(0, len(huellas), tamano):
+            bloque = huellas[inicio:inicio + tamano]
+            marcadores = ",".join("?" * len(bloque))
+            cursor = conn.execute(
+                f"SELECT clave FROM ofertas WHERE clave IN ({marcadores})",
+                bloque
+            )
+            existentes.update(por_huella[fila[0]] for fila in cursor)
+        
+        return existentes
+    
+    def registrar_ofertas_nuevas(self, ofertas):
+        """Filtra el lote contra la BD y guarda las nuevas en una transacción"""
+        # Quitar repetidas dentro del propio lote (se queda la primera)
+        unicas = {}
+        for oferta in ofertas:
+            unicas.setdefault(oferta["id"], oferta)
+        
+        with self.transaccion() as conn:
+            existentes = self.ids_existentes(unicas.keys())
+            candidatas = [o for oferta_id, o in unicas.items() if oferta_id not in existentes]
+            nuevas = self._insertar_nuevas(conn, candidatas, datetime.now())
+        
+        return nuevas
+    
+    def estadisticas_diarias(self, desde, hasta):
+        """Contadores de los días [desde, hasta) por día y portal"""
+        conn = self.conectar()
+        cursor = conn.execute("""
+            SELECT dia, portal, ofertas, con_salario, salario_suma, salario_min, salario_max
+            FROM estadisticas_diarias
+            WHERE dia >= ? AND dia < ?
+            ORDER BY dia, portal
+        """, (desde.isoformat(), hasta.isoformat()))
+        
+        return [
+            {
+                "dia": dia,
+                "portal": portal,
+                "ofertas": ofertas,
+                "con_salario": con_salario,
+                "salario_medio": suma / con_salario if con_salario else None,
+                "salario_min": minimo,
+                "salario_max": maximo
+            }
+            for dia, portal, ofertas, con_salario, suma, minimo, maximo in cursor
+        ]
+    
+    def estadisticas_del_dia(self, dia=None):
+        """Contadores de un día (hoy por defecto) por portal"""
+        dia = dia or datetime.now().date()
+        return self.estadisticas_diarias(dia, dia + timedelta(days=1))
+    
+    def encolar_mensajes(self, mensajes):
+        """Añade (oferta, mensaje) a la outbox; usar dentro de transaccion()"""
+        conn = self.conectar()
+        ahora = datetime.now()
+        conn.executemany(
+            "INSERT INTO outbox (clave, mensaje, creado) VALUES (?, ?, ?)",
+            [(huella_oferta(oferta["id"]), mensaje, ahora) for oferta, mensaje in mensajes]
         )
-        conn.commit()
-        conn.close()
+        self._confirmar()
+    
+    def mensajes_pendientes(self, limite=JobMonitorConfig.OUTBOX_LOTE):
+        """Mensajes sin enviar cuyo próximo intento ya ha llegado"""
+        conn = self.conectar()
+        cursor = conn.execute("""
+            SELECT id, clave, mensaje, intentos FROM outbox
+            WHERE enviado IS NULL
+              AND intentos < ?
+              AND (siguiente_intento IS NULL OR siguiente_intento <= ?)
+            ORDER BY id
+            LIMIT ?
+        """, (JobMonitorConfig.OUTBOX_MAX_INTENTOS, datetime.now(), limite))
+        return cursor.fetchall()
+    
+    def confirmar_envio(self, mensaje_id, clave):
+        """Marca el mensaje y su oferta como enviados"""
+        with self.transaccion() as conn:
+            conn.execute(
+                "UPDATE outbox SET enviado = ? WHERE id = ?",
+                (datetime.now(), mensaje_id)
+            )
+            conn.execute(
+                "UPDATE ofertas SET enviada_whatsapp = 1 WHERE clave = ?",
+                (clave,)
+            )
+    
+    def registrar_fallo_envio(self, mensaje_id, intentos):
+        """Suma un intento y aplaza el siguiente (espera exponencial)"""
+        conn = self.conectar()
+        espera = JobMonitorConfig.OUTBOX_ESPERA_BASE * 2 ** intentos
+        conn.execute(
+            "UPDATE outbox SET intentos = ?, siguiente_intento = ? WHERE id = ?",
+            (intentos + 1, datetime.now() + timedelta(seconds=espera), mensaje_id)
+        )
+        self._confirmar()
     
     def agregar_log(self, portal, accion, detalles=""):
         """Registra actividad en logs"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.conectar()
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO logs (fecha, portal, accion, detalles)
             VALUES (?, ?, ?, ?)
         """, (datetime.now(), portal, accion, detalles))
-        conn.commit()
-        conn.close()
+        self._confirmar()
 
 
 # ============================================================================
@@ -171,11 +409,22 @@ class DatabaseManager:
 class PortalScraper:
     """Extrae ofertas de diferentes portales"""
     
-    def __init__(self):
+    def __init__(self, db=None):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager()
+    
+    @staticmethod
+    def _soup(contenido):
+        """Árbol de la página con HTML_PARSER (html.parser si falta lxml)"""
+        try:
+            return BeautifulSoup(contenido, JobMonitorConfig.HTML_PARSER)
+        except FeatureNotFound:
+            print(f"⚠️  HTML_PARSER = '{JobMonitorConfig.HTML_PARSER}' necesita "
+                  f"pip install {JobMonitorConfig.HTML_PARSER}: se usa html.parser")
+            JobMonitorConfig.HTML_PARSER = "html.parser"
+            return BeautifulSoup(contenido, "html.parser")
     
     def buscar_en_linkedin(self):
         """Busca ofertas en LinkedIn"""
@@ -228,7 +477,7 @@ class PortalScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 jobs = soup.find_all("div", class_="job_seen_beacon")
                 
                 for job in jobs[:10]:  # Primeras 10
@@ -285,7 +534,7 @@ class PortalScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+                soup = self._soup(response.content)
                 jobs = soup.find_all("div", class_="offer")
                 
                 for job in jobs[:10]:
@@ -348,7 +597,13 @@ class WhatsAppManager:
     def enviar_oferta(self, oferta):
         """Envía una oferta por WhatsApp"""
         
-        mensaje = self._formatear_mensaje(oferta)
+        if self.enviar_mensaje(self.formatear_mensaje(oferta)):
+            print(f"✅ Oferta enviada: {oferta['titulo']}")
+            return True
+        return False
+    
+    def enviar_mensaje(self, mensaje):
+        """Envía un texto ya formateado por WhatsApp"""
         
         try:
             # URL de API de Twilio
@@ -363,11 +618,11 @@ class WhatsAppManager:
             response = requests.post(
                 url,
                 data=datos,
-                auth=(self.account_sid, self.auth_token)
+                auth=(self.account_sid, self.auth_token),
+                timeout=JobMonitorConfig.TWILIO_TIMEOUT
             )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Oferta enviada: {oferta['titulo']}")
                 return True
             else:
                 print(f"❌ Error enviando: {response.text}")
@@ -377,8 +632,8 @@ class WhatsAppManager:
             print(f"❌ Error de conexión Twilio: {e}")
             return False
     
-    def _formatear_mensaje(self, oferta):
-        """Formatea la oferta para WhatsApp"""
+    def formatear_mensaje(self, oferta):
+        """Texto de la oferta para WhatsApp (el que se guarda en la outbox)"""
         
         mensaje = f"""
 🎯 NUEVA OFERTA ENCONTRADA
@@ -394,23 +649,21 @@ class WhatsAppManager:
 """
         return mensaje.strip()
     
-    def enviar_resumen_diario(self, ofertas_nuevas):
-        """Envía resumen diario de ofertas"""
+    def enviar_resumen_diario(self, estadisticas):
+        """Envía resumen diario con los contadores por portal"""
         
-        if not ofertas_nuevas:
-            resumen = "📊 RESUMEN DIARIO\n\nNo hay nuevas ofertas hoy. ❌"
+        total = sum(estadistica["ofertas"] for estadistica in estadisticas)
+        if not total:
+            resumen = "📊 RESUMEN DIARIO\n\nNo hubo nuevas ofertas ayer. ❌"
         else:
             resumen = f"""
 📊 RESUMEN DIARIO
 
-✅ Se encontraron {len(ofertas_nuevas)} ofertas nuevas:
+✅ Ayer se encontraron {total} ofertas nuevas:
 
 """
-            for oferta in ofertas_nuevas[:5]:  # Máximo 5 en resumen
-                resumen += f"• {oferta['titulo']} - {oferta['empresa']}\n"
-            
-            if len(ofertas_nuevas) > 5:
-                resumen += f"\n... y {len(ofertas_nuevas) - 5} más"
+            for estadistica in estadisticas:
+                resumen += resumen_estadistica(estadistica) + "\n"
         
         try:
             url = f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Messages.json"
@@ -420,13 +673,99 @@ class WhatsAppManager:
                 "Body": resumen
             }
             
-            requests.post(url, data=datos, auth=(self.account_sid, self.auth_token))
+            requests.post(
+                url,
+                data=datos,
+                auth=(self.account_sid, self.auth_token),
+                timeout=JobMonitorConfig.TWILIO_TIMEOUT
+            )
             print("✅ Resumen diario enviado")
         
         except Exception as e:
             print(f"❌ Error enviando resumen: {e}")
 
 
+# ============================================================================
+# DESPACHO DE LA BANDEJA DE SALIDA
+# ============================================================================
+
+class DespachadorOutbox:
+    """Envía por WhatsApp los mensajes pendientes de la tabla outbox"""
+    
+    def __init__(self, whatsapp, db_name=JobMonitorConfig.DB_NAME,
+                 intervalo=JobMonitorConfig.OUTBOX_INTERVALO):
+        self.whatsapp = whatsapp
+        self.db_name = db_name
+        self.intervalo = intervalo
+        # La conexión se abre en el hilo que despacha (sqlite3 no la comparte)
+        self.db = None
+        self._parar = threading.Event()
+        self._hilo = None
+    
+    def despachar_pendientes(self):
+        """Envía los pendientes hasta vaciar la outbox o que fallen todos"""
+        if self.db is None:
+            self.db = DatabaseManager(self.db_name)
+        
+        enviados = fallidos = 0
+        while not self._parar.is_set():
+            pendientes = self.db.mensajes_pendientes()
+            if not pendientes:
+                break
+            for mensaje_id, clave, mensaje, intentos in pendientes:
+                if self.whatsapp.enviar_mensaje(mensaje):
+                    self.db.confirmar_envio(mensaje_id, clave)
+                    enviados += 1
+                else:
+                    # Se reintenta en una pasada posterior, no en esta
+                    self.db.registrar_fallo_envio(mensaje_id, intentos)
+                    fallidos += 1
+        
+        if enviados or fallidos:
+            print(f"📤 Outbox: {enviados} enviados, {fallidos} fallidos")
+        return enviados, fallidos
+    
+    def iniciar(self):
+        """Despacha en segundo plano cada `intervalo` segundos"""
+        # Una conexión abierta por un despacho síncrono no sirve en el hilo
+        if self.db is not None:
+            self.db.cerrar()
+            self.db = None
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="outbox", daemon=True)
+        self._hilo.start()
+    
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+    
+    def detener(self):
+        """Para el hilo; lo pendiente queda en la outbox para el próximo arranque"""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+    
+    def cerrar(self):
+        self.detener()
+        if self.db is not None:
+            self.db.cerrar()
+            self.db = None
+    
+    def _bucle(self):
+        try:
+            while not self._parar.is_set():
+                try:
+                    self.despachar_pendientes()
+                except sqlite3.Error as e:
+                    print(f"❌ Error despachando la outbox: {e}")
+                self._parar.wait(self.intervalo)
+        finally:
+            # La conexión pertenece a este hilo: se cierra aquí
+            if self.db is not None:
+                self.db.cerrar()
+                self.db = None
+
+
 # ============================================================================
 # ORQUESTADOR PRINCIPAL
 # ============================================================================
@@ -436,8 +775,9 @@ class JobMonitor:
     
     def __init__(self):
         self.db = DatabaseManager()
-        self.scraper = PortalScraper()
+        self.scraper = PortalScraper(db=self.db)
         self.whatsapp = WhatsAppManager()
+        self.despachador = DespachadorOutbox(self.whatsapp, self.db.db_name)
     
     def ejecutar_monitoreo(self):
         """Ejecuta una ronda completa de monitoreo"""
@@ -450,18 +790,21 @@ class JobMonitor:
         todas_ofertas = self.scraper.obtener_todas_las_ofertas()
         print(f"\n📊 Total de ofertas encontradas: {len(todas_ofertas)}")
         
-        ofertas_nuevas = []
+        # Guardar las nuevas y encolar sus mensajes en la misma transacción:
+        # el envío lo hace el despachador y no frena el scraping
+        with self.db.transaccion():
+            ofertas_nuevas = self.db.registrar_ofertas_nuevas(todas_ofertas)
+            self.db.encolar_mensajes(
+                [(oferta, self.whatsapp.formatear_mensaje(oferta)) for oferta in ofertas_nuevas]
+            )
+        
+        duplicadas = len(todas_ofertas) - len(ofertas_nuevas)
+        if duplicadas:
+            print(f"⏭️  {duplicadas} ofertas duplicadas")
         
-        # Procesar cada oferta
-        for oferta in todas_ofertas:
-            if not self.db.oferta_existe(oferta["id"]):
-                # Oferta nueva - guardar y enviar
-                self.db.guardar_oferta(oferta)
-                self.whatsapp.enviar_oferta(oferta)
-                self.db.marcar_como_enviada(oferta["id"])
-                ofertas_nuevas.append(oferta)
-            else:
-                print(f"⏭️  Oferta duplicada: {oferta['titulo']}")
+        # Sin despachador en segundo plano (ejecución única) se envía ahora
+        if not self.despachador.activo():
+            self.despachador.despachar_pendientes()
         
         # Enviar resumen
         if ofertas_nuevas:
@@ -486,15 +829,26 @@ class JobMonitor:
         print("⏰ Monitoreo cada 2 horas")
         print("📊 Resumen diario a las 09:00 AM\n")
         
+        # Envía también lo que quedó pendiente de la ejecución anterior
+        self.despachador.iniciar()
+        
         # Mantener el programa corriendo
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Verificar cada minuto
+        try:
+            while True:
+                schedule.run_pending()
+                time.sleep(60)  # Verificar cada minuto
+        finally:
+            self.cerrar()
+    
+    def cerrar(self):
+        """Para el despachador y libera la conexión a la BD"""
+        self.despachador.cerrar()
+        self.db.cerrar()
     
     def enviar_resumen_diario(self):
-        """Obtiene ofertas del día y envía resumen"""
-        # Aquí iría lógica para obtener ofertas del día
-        self.whatsapp.enviar_resumen_diario([])
+        """Envía el resumen de ayer leyendo solo los contadores diarios"""
+        ayer = datetime.now().date() - timedelta(days=1)
+        self.whatsapp.enviar_resumen_diario(self.db.estadisticas_del_dia(ayer))
 
 
 # ============================================================================
@@ -523,6 +877,7 @@ if __name__ == "__main__":
     
     if opcion == "1":
         monitor.ejecutar_monitoreo()
+        monitor.cerrar()
     elif opcion == "2":
         monitor.programar()
     else:
@@ -0,0 +1,78 @@
+"""
+Pruebas de DatabaseManager con varios procesos escribiendo en la misma BD
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_monitor_txt_2 import DatabaseManager, PortalScraper
+
+
+def oferta(numero, salario="30.000 € al año"):
+    return {
+        "id": f"indeed_Backend_{numero}_Empresa",
+        "titulo": f"Backend {numero}",
+        "empresa": "Empresa",
+        "url": f"https://es.indeed.com/v/{numero}",
+        "salario": salario,
+        "portal": "indeed",
+        "fecha_publicacion": datetime.now()
+    }
+
+
+def test_oferta_guardada_por_otro_proceso_no_es_nueva(tmp_path):
+    ruta = str(tmp_path / "job_monitor.db")
+    primero, segundo = DatabaseManager(ruta), DatabaseManager(ruta)
+    # Los dos cargan el índice antes de que ninguno guarde la oferta
+    primero.cargar_indice()
+    segundo.cargar_indice()
+    
+    try:
+        assert len(primero.registrar_ofertas_nuevas([oferta(1)])) == 1
+        nuevas = segundo.registrar_ofertas_nuevas([oferta(1), oferta(2)])
+        assert [o["id"] for o in nuevas] == [oferta(2)["id"]]
+        assert segundo.oferta_existe(oferta(2)["id"])
+        
+        conn = primero.conectar()
+        assert conn.execute("SELECT COUNT(*) FROM ofertas").fetchone()[0] == 2
+        ofertas, salario_suma = conn.execute(
+            "SELECT SUM(ofertas), SUM(salario_suma) FROM estadisticas_diarias"
+        ).fetchone()
+        assert ofertas == 2
+        assert salario_suma == 60000
+    finally:
+        primero.cerrar()
+        segundo.cerrar()
+
+
+def test_avistamiento_guarda_la_posicion_en_su_busqueda(tmp_path, monkeypatch):
+    db = DatabaseManager(str(tmp_path / "job_monitor.db"))
+    scraper = PortalScraper("backend", db=db)
+    # Dos páginas de tres ofertas; en la segunda, la cuarta de la búsqueda
+    paginas = [[oferta(numero) for numero in range(1, 4)],
+               [oferta(numero) for numero in range(4, 7)]]
+    monkeypatch.setattr(
+        scraper, "_descargar_pagina",
+        lambda portal, titulo, ubicacion, pagina:
+            (paginas[pagina], False) if pagina < len(paginas) else (None, False)
+    )
+    
+    try:
+        ofertas = scraper.buscar_en_portal("indeed", max_paginas=3)
+        assert [o["posicion"] for o in ofertas] == [1, 2, 3, 4, 5, 6]
+        
+        # Otra búsqueda del mismo portal fusionada antes no cambia la posición
+        otra = dict(oferta(9), posicion=1)
+        db.registrar_ofertas_nuevas([otra] + ofertas)
+        ronda = db.registrar_ronda([otra] + ofertas, 0)
+        posiciones = dict(db.conectar().execute(
+            "SELECT o.id, a.posicion FROM avistamientos a JOIN ofertas o USING (clave) "
+            "WHERE a.ronda = ?", (ronda,)
+        ).fetchall())
+        assert posiciones[oferta(4)["id"]] == 4
+        assert posiciones[otra["id"]] == 1
+    finally:
+        db.cerrar()
@@ -0,0 +1,62 @@
+"""
+Pruebas de LimitadorHosts: reintentos ante 429/503 frente al circuito
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_monitor_txt_2 import CircuitoAbierto, LimitadorHosts
+
+
+def limitador():
+    """Mismos reintentos y umbral que la configuración por defecto, sin esperas"""
+    return LimitadorHosts(peticiones_por_segundo=1000, rafaga=1000, reintentos=3,
+                          espera_base=0, espera_max=60, umbral_fallos=3,
+                          enfriamiento=3600)
+
+
+def fallar_peticion(limitador_hosts, host, codigo=429):
+    """Repite los intentos de una petición mientras el limitador pida reintentar"""
+    intento = 0
+    while limitador_hosts.registrar(host, codigo, intento=intento):
+        intento += 1
+    return intento
+
+
+def test_todos_los_reintentos_de_una_peticion_sin_abrir_el_circuito():
+    limitador_hosts = limitador()
+    
+    assert [limitador_hosts.registrar("h", 429, intento=i) for i in range(4)] == [
+        True, True, True, False
+    ]
+    # Una sola petición fallida no aparca el host
+    limitador_hosts.reservar("h")
+    assert limitador_hosts.hosts["h"]["abierto_hasta"] == 0.0
+
+
+def test_el_circuito_se_abre_con_peticiones_fallidas_seguidas():
+    limitador_hosts = limitador()
+    
+    for _ in range(2):
+        assert fallar_peticion(limitador_hosts, "h") == 3
+        limitador_hosts.reservar("h")
+    
+    assert fallar_peticion(limitador_hosts, "h") == 3
+    with pytest.raises(CircuitoAbierto):
+        limitador_hosts.reservar("h")
+
+
+def test_una_respuesta_buena_reinicia_la_cuenta():
+    limitador_hosts = limitador()
+    
+    for _ in range(2):
+        fallar_peticion(limitador_hosts, "h")
+    limitador_hosts.registrar("h", 200)
+    for _ in range(2):
+        fallar_peticion(limitador_hosts, "h", codigo=None)
+    
+    limitador_hosts.reservar("h")